@@ -0,0 +1,145 @@
+# Streamlit App Resources (세션 간 공유 자원 / GPT 호출 래퍼)
+# -----------------------------------------------------------------------------
+# stream.py 는 Rerun 마다 스크립트 전체가 다시 실행되므로, st.cache_data / st.cache_resource
+# 함수와 화면 출력용 GPT 래퍼는 이 모듈에 두어 프로세스당 1회만 정의합니다.
+#  - 데이터셋 / (Pool, FAISS Index) / Lexical Index : 세션 간 공유, 파일 시그니처 변경 시 재생성
+#  - 번역 메모리 / 응답 캐시 / 의미 캐시 : 프로세스 전역 SQLite 저장소
+#  - 로고 이미지 : 표시 폭으로 1회 축소
+# -----------------------------------------------------------------------------
+
+import io
+import os
+
+import faiss
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from dataset import create_sample_data, read_dataset, resolve_dataset_path
+from lexical_index import LexicalIndex
+from llm import GPT_MODEL, LLMError, chat_completion, stream_chat_completion
+from response_cache import ResponseCache
+from risk_engine import build_retriever
+from semantic_cache import SemanticCache
+from translation_memory import TranslationMemory
+
+TRANSLATION_MEMORY_PATH = "translation_memory.sqlite3"
+RESPONSE_CACHE_PATH = "response_cache.sqlite3"
+SEMANTIC_CACHE_PATH = "semantic_cache.sqlite3"
+
+
+@st.cache_data(show_spinner=False)
+def load_data(actual_filename: str, file_signature: tuple[int, int] | None = None) -> pd.DataFrame:
+    """데이터셋을 읽어와 전처리 후 DataFrame 반환 (file_signature 변경 시 캐시 무효화)
+
+    언어별 데이터셋 이름(건축 / Architecture / 建筑)은 호출 전에 resolve_dataset_filename 으로
+    실제 파일명으로 바꿔서 넘기므로, 같은 파일은 언어와 관계없이 한 번만 캐시됩니다.
+    """
+    try:
+        df = read_dataset(actual_filename)
+    except Exception as e:
+        st.warning(f"데이터 로딩 중 오류가 발생했습니다: {e}")
+        st.info("샘플 데이터를 사용합니다.")
+        return create_sample_data()
+    if df is None:
+        st.info(f"파일을 찾을 수 없습니다: {actual_filename}.xlsx 또는 {actual_filename}.xls")
+        st.info("샘플 데이터를 사용합니다.")
+        return create_sample_data()
+    return df
+
+
+@st.cache_resource(show_spinner=False, max_entries=6)
+def build_shared_retriever(dataset_file: str, file_signature: tuple[int, int] | None, embedding_provider: str,
+                           backend: str, _api_key: str, _progress_callback=None) -> tuple[pd.DataFrame, faiss.Index, np.ndarray]:
+    """(Pool DataFrame, FAISS Index, 임베딩) 을 프로세스당 1회 생성하여 모든 세션이 읽기 전용으로 공유
+
+    Cache Key 는 (데이터셋, 파일 시그니처, 임베딩 Provider, 인덱스 종류) 이며, 파일이 바뀌면 새 Key 로 다시 생성됩니다.
+    기존 객체를 참조 중인 세션은 교체 전까지 이전 인덱스를 안전하게 계속 사용합니다.
+    """
+    df = load_data(dataset_file, file_signature)
+    return build_retriever(df, resolve_dataset_path(dataset_file, "Korean"), embedding_provider, backend,
+                           _api_key, _progress_callback)
+
+
+@st.cache_resource(show_spinner=False, max_entries=6)
+def build_shared_lexical_index(dataset_file: str, file_signature: tuple, _pool_df: pd.DataFrame) -> LexicalIndex:
+    """데이터셋 Pool 의 문자 n-gram BM25 인덱스를 (파일, 파일 서명) 별 1회 생성하여 모든 세션이 공유
+
+    임베딩 제공자/인덱스 방식/연합 검색 가중치와 무관하므로 이 값들이 바뀌어도 다시 생성하지 않습니다.
+    """
+    return LexicalIndex(_pool_df)
+
+
+def generate_with_gpt(prompt: str, api_key: str, model: str=GPT_MODEL, max_retries: int=3,
+                      cache: ResponseCache | None=None) -> str:
+    """GPT 모델 호출 래퍼. Retry 로직 포함, 실패 시 오류를 화면에 표시하고 빈 문자열 반환."""
+    try:
+        return chat_completion(
+            prompt, api_key, model=model, max_retries=max_retries, cache=cache,
+            on_retry=lambda attempt, total, e: st.warning(f"GPT 재시도 중... ({attempt}/{total})")
+        )
+    except LLMError as e:
+        st.error(str(e))
+        return ""
+
+
+def stream_with_gpt(prompt: str, api_key: str, model: str=GPT_MODEL, cache: ResponseCache | None=None):
+    """GPT Streaming 래퍼. 토큰 단위로 yield 하며, 실패 시(스트리밍 도중 포함) 오류를 화면에 표시하고 LLMError 발생."""
+    try:
+        yield from stream_chat_completion(prompt, api_key, model=model, cache=cache)
+    except LLMError as e:
+        st.error(str(e))
+        raise
+
+
+def generate_with_live_output(prompt: str, api_key: str, label: str, as_json: bool=False,
+                              cache: ResponseCache | None=None) -> str:
+    """GPT 응답을 토큰 단위로 화면에 표시하며 생성하고 전체 텍스트 반환 (st.write_stream)
+
+    스트리밍이 중간에 실패하면 일부만 받은 응답 대신 빈 문자열을 반환합니다 (generate_with_gpt 와 동일).
+    """
+    st.markdown(f"**{label}**")
+    try:
+        if as_json:
+            # JSON 응답은 코드 블록으로 누적 표시
+            box, text = st.empty(), ""
+            for delta in stream_with_gpt(prompt, api_key, cache=cache):
+                text += delta
+                box.code(text, language="json")
+            return text.strip()
+        output = st.write_stream(stream_with_gpt(prompt, api_key, cache=cache))
+    except LLMError:
+        return ""
+    return output.strip() if isinstance(output, str) else ""
+
+
+@st.cache_resource(show_spinner=False)
+def get_translation_memory() -> TranslationMemory:
+    """프로세스 전역 번역 메모리 (SQLite + LRU). 모든 세션이 공유"""
+    return TranslationMemory(TRANSLATION_MEMORY_PATH)
+
+
+@st.cache_resource(show_spinner=False)
+def get_response_cache() -> ResponseCache:
+    """프로세스 전역 Phase 1 / Phase 2 GPT 응답 캐시 (SQLite, TTL + 크기 제한). 모든 세션이 공유"""
+    return ResponseCache(RESPONSE_CACHE_PATH)
+
+
+@st.cache_resource(show_spinner=False)
+def get_semantic_cache() -> SemanticCache:
+    """프로세스 전역 의미 캐시 (유사 작업활동의 평가 결과 재사용). 모든 세션이 공유"""
+    return SemanticCache(SEMANTIC_CACHE_PATH)
+
+
+@st.cache_data(show_spinner=False)
+def load_logo(path: str, width: int) -> bytes | None:
+    """표시 폭으로 1회 축소한 로고 PNG (파일 경로를 넘기면 Rerun 마다 decode / resize 가 반복됨)"""
+    if not os.path.exists(path):
+        return None
+    from PIL import Image
+
+    with Image.open(path) as img:
+        height = max(1, round(img.height * width / img.width))
+        buf = io.BytesIO()
+        img.resize((width, height), Image.LANCZOS).save(buf, format="PNG")
+    return buf.getvalue()
@@ -0,0 +1,229 @@
+# Batch Risk Assessment (작업분석 일괄 평가)
+# -----------------------------------------------------------------------------
+# 업로드된 "작업분석 및 예정공정표 Job Analysis" 시트의 작업순서 전체를 한 번에 평가합니다.
+#  - 행 단위 평가(risk_engine.assess_activity)를 제한된 개수의 Worker 로 동시 실행
+#  - GPT 요청 속도는 llm.rate_limiter 가 프로세스 전역으로 제한
+#  - 완료된 행은 Checkpoint(JSONL) 에 즉시 기록 → 중단 후 다시 실행하면 남은 행만 평가
+# 결과는 create_excel_download 로 여러 행의 위험성평가결과 시트 하나에 모아 저장합니다.
+# Streamlit 없이 실행하는 CLI 예)
+#   python batch_assessment.py 작업분석.xlsx --dataset 건축 --api-key sk-...
+#   python batch_assessment.py --activity "철골 하역 작업" --activity "비계 설치" --language English
+# -----------------------------------------------------------------------------
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable
+
+import pandas as pd
+
+from dataset import dataset_file_signature, resolve_dataset_path
+from embedding_store import content_hash
+from embeddings import EMBEDDING_PROVIDERS, get_embedding_provider
+from lexical_index import LexicalIndex
+from llm import GPT_MODEL, metrics
+from report import create_excel_download
+from response_cache import ResponseCache
+from risk_engine import MIN_SIMILARITY, assess_activity, build_retriever, load_dataset
+from semantic_cache import SEMANTIC_CACHE_THRESHOLD, SemanticCache, json_default, semantic_scope
+from translation import LANGUAGE_CODES
+from translation_memory import TranslationMemory
+from vector_index import INDEX_BACKENDS
+
+JOB_ANALYSIS_SHEET = "작업분석 및 예정공정표 Job Analysis"
+JOB_ANALYSIS_COLUMNS = [
+    "순번 No.",
+    "작업순서 WORK SEQUENCE",
+    "작업 시작일자 Start Date",
+    "작업 종료일자 Finish Date",
+]
+WORK_SEQUENCE_COLUMN = "작업순서 WORK SEQUENCE"
+
+# 동시에 평가할 작업순서 수 (행 내부의 번역 요청은 별도로 병렬 실행됨)
+BATCH_MAX_CONCURRENCY = 4
+CHECKPOINT_DIR = "batch_checkpoints"
+
+
+def read_job_analysis(source: Any) -> pd.DataFrame:
+    """업로드 Excel 에서 Job Analysis 시트를 읽어 작업순서가 있는 행만 반환
+
+    시트 이름이 다르면 "작업순서 WORK SEQUENCE" 컬럼이 있는 첫 시트를 사용합니다.
+    """
+    sheets = pd.read_excel(source, sheet_name=None)
+    df = sheets.get(JOB_ANALYSIS_SHEET)
+    if df is None:
+        df = next((s for s in sheets.values() if WORK_SEQUENCE_COLUMN in s.columns), None)
+    if df is None or WORK_SEQUENCE_COLUMN not in df.columns:
+        raise ValueError(f"'{WORK_SEQUENCE_COLUMN}' 컬럼이 있는 시트를 찾을 수 없습니다.")
+
+    df = df.copy()
+    df[WORK_SEQUENCE_COLUMN] = df[WORK_SEQUENCE_COLUMN].fillna("").astype(str).str.strip()
+    df = df[df[WORK_SEQUENCE_COLUMN] != ""].reset_index(drop=True)
+    for col in JOB_ANALYSIS_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
+    if df["순번 No."].isna().all() or (df["순번 No."] == "").all():
+        df["순번 No."] = range(1, len(df) + 1)
+    return df[JOB_ANALYSIS_COLUMNS]
+
+
+def batch_checkpoint_path(upload_bytes: bytes, *settings: Any) -> str:
+    """업로드 파일 내용 + 평가 설정(데이터셋, 결과 언어 등) 별 Checkpoint 파일 경로"""
+    digest = hashlib.sha256(upload_bytes + repr(settings).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CHECKPOINT_DIR, f"batch_{digest}.jsonl")
+
+
+def load_checkpoint(path: str) -> dict[str, dict]:
+    """Checkpoint 의 {작업순서 해시: 평가 결과}. 기록 도중 끊긴 마지막 줄은 무시"""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[record["key"]] = record["result"]
+    return done
+
+
+def run_batch(activities: list[str], assess_fn: Callable[[str], dict], checkpoint_path: str | None = None,
+              max_workers: int = BATCH_MAX_CONCURRENCY,
+              progress_callback: Callable[[int, int], None] | None = None) -> tuple[list[dict | None], dict[int, str]]:
+    """작업순서 목록을 동시 평가하여 (입력 순서의 결과 목록, {행 번호: 오류 메시지}) 반환
+
+    동일한 작업순서는 한 번만 평가하며, Checkpoint 에 있는 작업순서는 다시 평가하지 않습니다.
+    실패한 행의 결과는 None 이고 Checkpoint 에 기록되지 않으므로 재실행 시 다시 시도됩니다.
+    progress_callback(done, total) 은 호출 스레드에서 실행됩니다.
+    """
+    keys = [content_hash(a) for a in activities]
+    text_of = dict(zip(keys, activities))
+    results = load_checkpoint(checkpoint_path) if checkpoint_path else {}
+    pending = [k for k in dict.fromkeys(keys) if k not in results]
+    total = len(text_of)
+    done = total - len(pending)
+    errors: dict[str, str] = {}
+    if progress_callback:
+        progress_callback(done, total)
+
+    if pending:
+        checkpoint = None
+        if checkpoint_path:
+            os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+            checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as pool:
+                futures = {pool.submit(assess_fn, text_of[k]): k for k in pending}
+                for future in as_completed(futures):
+                    key = futures[future]
+                    try:
+                        results[key] = future.result()
+                    except Exception as e:
+                        errors[key] = str(e)
+                    else:
+                        if checkpoint:
+                            checkpoint.write(json.dumps({"key": key, "result": results[key]},
+                                                        ensure_ascii=False, default=json_default) + "\n")
+                            checkpoint.flush()
+                    done += 1
+                    if progress_callback:
+                        progress_callback(done, total)
+        finally:
+            if checkpoint:
+                checkpoint.close()
+
+    return [results.get(k) for k in keys], {i: errors[k] for i, k in enumerate(keys) if k in errors}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="작업분석 Excel / 작업활동 목록 일괄 위험성 평가")
+    parser.add_argument("job_files", nargs="*", help="작업분석 및 예정공정표 양식 Excel 파일")
+    parser.add_argument("--activity", action="append", default=[], help="평가할 작업활동 (여러 번 지정 가능)")
+    parser.add_argument("--dataset", default="건축", help="유사사례 데이터셋 (건축 | 토목 | 플랜트)")
+    parser.add_argument("--language", default="Korean", choices=list(LANGUAGE_CODES), help="결과 언어")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY", ""))
+    parser.add_argument("--embedding-provider", default="openai", choices=EMBEDDING_PROVIDERS)
+    parser.add_argument("--backend", default="flat", choices=INDEX_BACKENDS)
+    parser.add_argument("--min-similarity", type=float, default=MIN_SIMILARITY)
+    parser.add_argument("--hybrid", action="store_true", help="문자 n-gram BM25 검색을 함께 사용 (임베딩 장애 시 단독 사용)")
+    parser.add_argument("--workers", type=int, default=BATCH_MAX_CONCURRENCY)
+    parser.add_argument("--translation-memory", default="translation_memory.sqlite3")
+    parser.add_argument("--response-cache", default="response_cache.sqlite3", help="Phase 1/2 GPT 응답 캐시")
+    parser.add_argument("--no-response-cache", action="store_true", help="응답 캐시를 사용하지 않고 새로 생성")
+    parser.add_argument("--semantic-cache", default="semantic_cache.sqlite3", help="유사 작업활동 평가 결과 캐시")
+    parser.add_argument("--semantic-threshold", type=float, default=SEMANTIC_CACHE_THRESHOLD)
+    parser.add_argument("--no-semantic-cache", action="store_true", help="유사 작업활동 결과를 재사용하지 않음")
+    parser.add_argument("--output-dir", default=".", help="결과 Excel 저장 폴더")
+    args = parser.parse_args()
+    if not args.job_files and not args.activity:
+        parser.error("작업분석 Excel 파일 또는 --activity 를 지정하세요.")
+
+    # 평가 대상: (출력 파일명, 작업분석 DataFrame, Checkpoint 구분용 입력 bytes)
+    jobs = []
+    for path in args.job_files:
+        with open(path, "rb") as f:
+            upload_bytes = f.read()
+        name = f"{os.path.splitext(os.path.basename(path))[0]}.risk_assessment.xlsx"
+        jobs.append((name, read_job_analysis(path), upload_bytes))
+    if args.activity:
+        job_df = pd.DataFrame({col: "" for col in JOB_ANALYSIS_COLUMNS}, index=range(len(args.activity)))
+        job_df["순번 No."] = range(1, len(args.activity) + 1)
+        job_df[WORK_SEQUENCE_COLUMN] = args.activity
+        jobs.append(("risk_assessment_report.xlsx", job_df, "\n".join(args.activity).encode("utf-8")))
+
+    dataset_path = resolve_dataset_path(args.dataset, "Korean")
+    pool_df, index, _ = build_retriever(load_dataset(args.dataset), dataset_path, args.embedding_provider,
+                                        args.backend, args.api_key)
+    lexical = LexicalIndex(pool_df) if args.hybrid else None
+    provider = get_embedding_provider(args.embedding_provider, args.api_key)
+    tm = TranslationMemory(args.translation_memory)
+    cache = None if args.no_response_cache else ResponseCache(args.response_cache)
+    semantic_cache = None if args.no_semantic_cache else SemanticCache(args.semantic_cache)
+    # 앱과 같은 설정이면 같은 Checkpoint 를 사용 (데이터셋, 파일 시그니처, Provider, 인덱스 종류)
+    retriever_key = (args.dataset, dataset_file_signature(dataset_path), args.embedding_provider, args.backend)
+    if args.hybrid:
+        retriever_key += ("hybrid",)
+    cache_scope = semantic_scope(retriever_key, args.language, round(args.min_similarity, 4), GPT_MODEL)
+
+    def assess_row(activity: str) -> dict:
+        return assess_activity(activity, args.api_key, pool_df, index, provider, tm,
+                               args.language, args.min_similarity, cache=cache, semantic_cache=semantic_cache,
+                               cache_scope=cache_scope, semantic_threshold=args.semantic_threshold, lexical=lexical)
+
+    def on_progress(done: int, total: int) -> None:
+        print(f"\r  {done}/{total}", end="", file=sys.stderr, flush=True)
+
+    failed = 0
+    os.makedirs(args.output_dir, exist_ok=True)
+    for name, job_df, upload_bytes in jobs:
+        print(f"{name}: 작업순서 {len(job_df)}건", file=sys.stderr)
+        checkpoint_path = batch_checkpoint_path(upload_bytes, retriever_key, args.language, args.min_similarity)
+        results, errors = run_batch(job_df[WORK_SEQUENCE_COLUMN].tolist(), assess_row, checkpoint_path,
+                                    max_workers=args.workers, progress_callback=on_progress)
+        print(file=sys.stderr)
+        for i, message in errors.items():
+            print(f"  실패 {job_df.iloc[i]['순번 No.']}. {job_df.iloc[i][WORK_SEQUENCE_COLUMN]}: {message}",
+                  file=sys.stderr)
+        failed += len(errors)
+
+        completed = [r for r in results if r is not None]
+        if completed:
+            output_path = os.path.join(args.output_dir, name)
+            with open(output_path, "wb") as f:
+                f.write(create_excel_download(completed, [], job_analysis_df=job_df))
+            print(output_path)
+
+    for kind, m in metrics.summary().items():
+        print(f"{kind}: {m['count']}회 (오류 {m['errors']}), p50 {m['p50_ms']:.0f} ms, "
+              f"p95 {m['p95_ms']:.0f} ms", file=sys.stderr)
+
+    # 실패한 행이 있으면 종료 코드 1 (같은 명령으로 다시 실행하면 남은 행만 평가)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Vector Index Benchmark
+# -----------------------------------------------------------------------------
+# vector_index.py 의 backend 별로 Recall@k(Flat 기준), QPS, 메모리 사용량을 측정합니다.
+# 앱(risk_engine.build_retriever)과 같이 L2 정규화 벡터의 내적(Cosine) 인덱스로 측정합니다.
+# 사용 예)
+#   python bench_index.py --vectors 건축.text-embedding-3-large.store.npy
+#   python bench_index.py --synthetic 50000 --dim 3072 --backends flat ivf hnsw
+#   python bench_index.py --synthetic 20000 --dim 256 --sync-check
+# --sync-check: 1차 구성에서 임베딩 실패(0 벡터)였던 행이 2차 증분 동기화 후 검색되는지 확인
+# -----------------------------------------------------------------------------
+
+import argparse
+import os
+import tempfile
+import time
+
+import faiss
+import numpy as np
+
+from embedding_store import read_store
+from vector_index import INDEX_BACKENDS, build_index, index_memory_bytes, load_or_sync_index, normalize_vectors
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray) -> float:
+    """Flat 결과(truth) 대비 각 쿼리 상위 k 개 중 일치 비율의 평균"""
+    hits = [len(set(t) & set(f[f >= 0])) / len(t) for t, f in zip(truth, found)]
+    return float(np.mean(hits))
+
+
+def failed_rows_self_hit(vecs: np.ndarray, backend: str, n_failed: int) -> float:
+    """앞 n_failed 행을 0 벡터(임베딩 실패)로 1차 동기화 → 실제 벡터로 2차 동기화 후 자기 자신이 top-1 인 비율"""
+    ids = np.arange(len(vecs), dtype="int64")
+    failed = vecs.copy()
+    failed[:n_failed] = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = os.path.join(tmp_dir, f"{backend}.faiss")
+        load_or_sync_index(failed, ids, backend, cache_path, metric=faiss.METRIC_INNER_PRODUCT)
+        index, _ = load_or_sync_index(vecs, ids, backend, cache_path, metric=faiss.METRIC_INNER_PRODUCT)
+    _, found = index.search(vecs[:n_failed], 1)
+    return float(np.mean(found[:, 0] == ids[:n_failed]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="FAISS 인덱스 backend 별 Recall/QPS/메모리 비교")
+    parser.add_argument("--vectors", help="EmbeddingStore 의 .store.npy 파일 경로")
+    parser.add_argument("--synthetic", type=int, default=20000, help="--vectors 미지정 시 생성할 벡터 수")
+    parser.add_argument("--dim", type=int, default=3072, help="synthetic 벡터 차원")
+    parser.add_argument("--queries", type=int, default=500, help="쿼리 개수")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--backends", nargs="+", default=list(INDEX_BACKENDS), choices=INDEX_BACKENDS)
+    parser.add_argument("--sync-check", action="store_true", help="임베딩 실패 행의 증분 동기화 후 검색 여부 확인")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    if args.vectors:
+        vecs = np.asarray(read_store(args.vectors)[1], dtype="float32")
+    else:
+        # 실제 임베딩처럼 군집 구조를 가지도록 중심점 주변에 샘플 생성
+        centers = rng.standard_normal((max(1, args.synthetic // 100), args.dim)).astype("float32")
+        vecs = centers[rng.integers(0, len(centers), args.synthetic)]
+        vecs += 0.3 * rng.standard_normal(vecs.shape).astype("float32")
+
+    # 쿼리: Corpus 벡터에 노이즈를 더해 "비슷하지만 동일하지 않은" 작업활동을 모사
+    q_idx = rng.integers(0, len(vecs), args.queries)
+    queries = vecs[q_idx] + 0.1 * rng.standard_normal((args.queries, vecs.shape[1])).astype("float32")
+    k = min(args.k, len(vecs))
+    vecs, queries = normalize_vectors(vecs), normalize_vectors(queries)
+
+    print(f"corpus={len(vecs)} dim={vecs.shape[1]} queries={len(queries)} k={k}")
+    print(f"{'backend':<8} {'build(s)':>9} {'recall@k':>9} {'QPS':>10} {'memory(MB)':>11}")
+
+    truth = None
+    for backend in ["flat"] + [b for b in args.backends if b != "flat"]:
+        t0 = time.perf_counter()
+        index = build_index(vecs, backend, metric=faiss.METRIC_INNER_PRODUCT)
+        build_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        _, found = index.search(queries, k)
+        qps = len(queries) / (time.perf_counter() - t0)
+
+        if truth is None:
+            truth = found
+        if backend in args.backends:
+            mem_mb = index_memory_bytes(index) / 1024 ** 2
+            print(f"{backend:<8} {build_s:>9.2f} {recall_at_k(truth, found):>9.3f} {qps:>10.0f} {mem_mb:>11.1f}")
+
+    if args.sync_check:
+        n_failed = max(1, len(vecs) // 100)
+        print(f"\nsync-check: 1차 구성에서 실패한 {n_failed} 행의 2차 동기화 후 self-hit@1")
+        for backend in args.backends:
+            print(f"{backend:<8} {failed_rows_self_hit(vecs, backend, n_failed):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Normalization Benchmark
+# -----------------------------------------------------------------------------
+# normalize.py 의 Vectorized 등급 / content 생성과 행 단위 DataFrame.apply 방식을
+# 합성 데이터셋(기본 100k 행)으로 비교합니다. 두 방식의 결과가 같은지도 함께 확인합니다.
+# 사용 예)
+#   python bench_normalize.py
+#   python bench_normalize.py --rows 500000 --repeat 5
+# -----------------------------------------------------------------------------
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from normalize import COLUMN_MAPPING, build_content, determine_grade, determine_grades, normalize_dataset
+
+WORDS = [
+    "철골", "하역", "작업", "비계", "설치", "해체", "용접", "굴착", "되메우기", "고소작업대",
+    "추락", "낙하", "협착", "감전", "화재", "안전대", "착용", "신호수", "배치", "점검",
+]
+
+
+def synthetic_dataset(rows: int, seed: int = 42) -> pd.DataFrame:
+    """원본 Excel 과 같은 컬럼 구성의 합성 데이터셋 (일부 결측치 포함)"""
+    rng = np.random.default_rng(seed)
+    words = np.array(WORDS, dtype=object)
+
+    def sentences(n_words: int) -> np.ndarray:
+        picked = words[rng.integers(0, len(words), (rows, n_words))]
+        out = picked[:, 0]
+        for j in range(1, n_words):
+            out = out + " " + picked[:, j]
+        return out
+
+    df = pd.DataFrame({
+        original: sentences(n) for original, n in zip(COLUMN_MAPPING, (6, 8, 2, 12))
+    })
+    df["빈도"] = rng.integers(1, 6, rows).astype("float64")
+    df["강도"] = rng.integers(1, 6, rows).astype("float64")
+    df.loc[rng.random(rows) < 0.01, "빈도"] = np.nan
+    return df
+
+
+def timed(fn, repeat: int) -> tuple[float, object]:
+    """repeat 회 실행 중 최소 시간(초)과 마지막 결과"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="행 단위 apply 대비 Vectorized 정규화 속도 비교")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    raw = synthetic_dataset(args.rows)
+    normalize_s, df = timed(lambda: normalize_dataset(raw), args.repeat)
+    print(f"rows={len(df)}  normalize_dataset: {normalize_s * 1000:.0f} ms")
+    print(f"{'step':<10} {'apply(ms)':>10} {'vectorized(ms)':>15} {'speedup':>8} {'equal':>6}")
+
+    steps = [
+        ("grade",
+         lambda: df["T"].apply(determine_grade),
+         lambda: determine_grades(df["T"])),
+        ("content",
+         lambda: df.apply(lambda r: " ".join(r.values.astype(str)), axis=1),
+         lambda: build_content(df)),
+    ]
+    for name, row_fn, vec_fn in steps:
+        row_s, expected = timed(row_fn, args.repeat)
+        vec_s, actual = timed(vec_fn, args.repeat)
+        equal = expected.tolist() == actual.tolist()
+        print(f"{name:<10} {row_s * 1000:>10.0f} {vec_s * 1000:>15.0f} {row_s / vec_s:>7.1f}x {str(equal):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Startup Benchmark (Streamlit 앱 Cold Start / Rerun 시간)
+# -----------------------------------------------------------------------------
+# 1) 모듈별 Cold import 시간: 새 Python 프로세스에서 각 모듈을 처음 import 하는 데 걸린 시간
+# 2) Rerun 시간: import 가 끝난 프로세스에서 stream.py 본문을 최초 실행 → 일반 Rerun →
+#    언어 변경 Rerun 순으로 반복 실행하여 측정 (streamlit bare 모드)
+# Cold Start 는 1) 의 "stream" 행 (import + 최초 스크립트 실행) 입니다.
+# 사용 예)
+#   python bench_startup.py
+#   python bench_startup.py --modules stream llm openai --reruns 20
+# -----------------------------------------------------------------------------
+
+import argparse
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_MODULES = [
+    "streamlit", "pandas", "faiss", "openai", "torch",
+    "llm", "embeddings", "dataset", "risk_engine", "ui_texts", "stream",
+]
+
+
+def cold_import_seconds(module: str) -> float | None:
+    """새 프로세스에서 module 을 import 하는 데 걸린 시간(초). import 실패 시 None"""
+    code = (
+        "import time; t0 = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - t0)"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Streamlit 앱 Cold Start / Rerun 시간 측정")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES, help="Cold import 시간을 잴 모듈")
+    parser.add_argument("--app", default="stream.py", help="측정할 Streamlit 스크립트")
+    parser.add_argument("--reruns", type=int, default=10, help="Rerun 반복 횟수")
+    args = parser.parse_args()
+
+    print(f"{'module':<26} {'cold import(ms)':>16}")
+    for module in args.modules:
+        seconds = cold_import_seconds(module)
+        print(f"{module:<26} {'-' if seconds is None else f'{seconds * 1000:.0f}':>16}")
+
+    # Rerun: 모듈 import 가 끝난 프로세스에서 스크립트 본문만 다시 실행하는 비용
+    # (streamlit bare 모드로 실행하므로 브라우저/서버 통신 시간은 포함되지 않음)
+    import streamlit as st
+
+    logging.disable(logging.WARNING)  # bare 모드의 "missing ScriptRunContext" 경고 생략
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.app)))
+    with open(args.app, encoding="utf-8") as f:
+        code = compile(f.read(), args.app, "exec")
+
+    def run_script() -> float:
+        t0 = time.perf_counter()
+        exec(code, {"__name__": "__main__"})
+        return (time.perf_counter() - t0) * 1000
+
+    first_ms = run_script()
+    rerun_ms = [run_script() for _ in range(args.reruns)]
+    switch_ms = []
+    languages = ["English", "Chinese", "Korean"]
+    for i in range(args.reruns):
+        st.session_state["language"] = languages[i % len(languages)]
+        switch_ms.append(run_script())
+
+    print()
+    print(f"{'app script':<26} {'p50(ms)':>10} {'max(ms)':>10}")
+    print(f"{'first run (with imports)':<26} {first_ms:>10.1f} {first_ms:>10.1f}")
+    for name, samples in (("rerun", rerun_ms), ("language switch", switch_ms)):
+        if samples:
+            print(f"{name:<26} {statistics.median(samples):>10.1f} {max(samples):>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# Multilingual Corpus Build (Offline)
+# -----------------------------------------------------------------------------
+# 데이터셋(load_data 와 동일한 정규화)을 미리 번역/임베딩하여 Parquet Artifact 로 저장합니다.
+#  - 컬럼: content_hash, {activity,hazard,plan}_{ko,en,zh}, embedding(float32 고정 길이 리스트)
+#  - 앱은 content_hash 로 번역을 조회만 하고, Query 시점에 LLM 번역을 호출하지 않습니다.
+#  - 번역에 실패한 값(원문 그대로 반환된 값)은 null 로 저장 → 앱이 Query 시점에 다시 번역
+# 사용 예)
+#   python corpus_build.py 건축 토목 플랜트 --api-key sk-...
+# -----------------------------------------------------------------------------
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dataset import read_dataset, resolve_dataset_path
+from embedding_store import EmbeddingStore, content_hash
+from embeddings import EMBEDDING_PROVIDERS, get_embedding_provider
+from normalize import build_content
+from translation import LANGUAGE_CODES, TRANSLATION_FIELDS, translate_batch
+from translation_memory import TranslationMemory
+
+TRANSLATED_COLUMNS = [
+    f"{field}_{code}" for field in TRANSLATION_FIELDS for code in LANGUAGE_CODES.values()
+]
+
+
+def corpus_artifact_path(dataset_path: str) -> str:
+    """데이터셋 파일 옆 Corpus Artifact 경로 (예: 건축.corpus.parquet)"""
+    return f"{os.path.splitext(dataset_path)[0]}.corpus.parquet"
+
+
+def translated_or_none(sources: list[dict[str, str]],
+                       results: list[dict[str, str]]) -> list[dict[str, str | None]]:
+    """translate_batch 결과 중 원문과 같은 값(번역 실패)을 None 으로 바꾼 목록"""
+    return [{field: (None if text == source.get(field) else text) for field, text in result.items()}
+            for source, result in zip(sources, results)]
+
+
+def build_corpus_artifact(dataset_file: str, api_key: str, embedding_provider: str = "openai",
+                          translation_memory_path: str = "translation_memory.sqlite3") -> str:
+    """dataset_file(확장자 제외) 을 번역/임베딩하여 Parquet Artifact 로 저장 후 경로 반환"""
+    if not api_key:
+        raise ValueError("번역에 필요한 API 키가 설정되어 있지 않습니다.")
+    dataset_path = resolve_dataset_path(dataset_file, "Korean")
+    df = read_dataset(dataset_file) if dataset_path else None
+    if df is None:
+        raise FileNotFoundError(f"데이터셋 파일을 찾을 수 없습니다: {dataset_file}.xlsx 또는 {dataset_file}.xls")
+
+    df = df.reset_index(drop=True)
+    df["content"] = build_content(df)
+    df["content_hash"] = df["content"].map(content_hash)
+    df = df.drop_duplicates("content_hash").reset_index(drop=True)
+
+    # 1️⃣ 임베딩 (EmbeddingStore 재사용 → 앱과 동일한 벡터)
+    provider = get_embedding_provider(embedding_provider, api_key)
+    vecs = np.asarray(
+        EmbeddingStore(dataset_path, provider.model).get_or_embed(df["content"].tolist(), provider.embed),
+        dtype="float32"
+    )
+
+    # 2️⃣ 번역: 한국어 → 영어 → 중국어 (JSON 배치 번역, 앱과 동일한 번역 메모리 Key)
+    # translate_batch 는 실패한 항목을 원문 그대로 반환하므로 원문과 같은 값은 null 로 저장하고,
+    # 영어 번역에 실패한 항목은 한국어를 영어로 취급하지 않도록 중국어 번역 대상에서 제외
+    tm = TranslationMemory(translation_memory_path)
+    rows_ko = [{field: str(row[src_col]) for field, (src_col, _) in TRANSLATION_FIELDS.items()}
+               for _, row in df.iterrows()]
+    rows_en = translated_or_none(rows_ko, translate_batch(rows_ko, "Korean", "English", api_key, tm))
+    rows_en_ok = [{field: text for field, text in row.items() if text is not None} for row in rows_en]
+    rows_zh = translated_or_none(rows_en_ok, translate_batch(rows_en_ok, "English", "Chinese", api_key, tm))
+    out = pd.DataFrame({"content_hash": df["content_hash"]})
+    for field in TRANSLATION_FIELDS:
+        for code, rows in (("ko", rows_ko), ("en", rows_en), ("zh", rows_zh)):
+            out[f"{field}_{code}"] = [row.get(field) for row in rows]
+
+    # 3️⃣ Parquet 저장 (embedding 은 FixedSizeList<float32>)
+    table = pa.Table.from_pandas(out, preserve_index=False)
+    table = table.append_column(
+        "embedding", pa.FixedSizeListArray.from_arrays(pa.array(vecs.ravel()), vecs.shape[1])
+    )
+    table = table.replace_schema_metadata({"embedding_model": provider.model})
+    path = corpus_artifact_path(dataset_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_corpus_translations(path: str) -> pd.DataFrame:
+    """Artifact 의 번역 컬럼만 memory-map 으로 읽어 content_hash 인덱스 DataFrame 반환"""
+    table = pq.read_table(path, columns=["content_hash"] + TRANSLATED_COLUMNS, memory_map=True)
+    return table.to_pandas().set_index("content_hash")
+
+
+def attach_corpus_translations(pool_df: pd.DataFrame, translations: pd.DataFrame) -> pd.DataFrame:
+    """pool_df 의 content 해시로 사전 번역 컬럼을 조회하여 추가 (없는 행은 NaN)"""
+    hashes = pool_df["content"].map(content_hash)
+    for col in TRANSLATED_COLUMNS:
+        pool_df[col] = hashes.map(translations[col])
+    return pool_df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="데이터셋 다국어 번역 + 임베딩 Parquet Artifact 생성")
+    parser.add_argument("datasets", nargs="+", help="확장자 없는 데이터셋 파일명 (예: 건축 토목 플랜트)")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY", ""))
+    parser.add_argument("--embedding-provider", default="openai", choices=EMBEDDING_PROVIDERS)
+    parser.add_argument("--translation-memory", default="translation_memory.sqlite3")
+    args = parser.parse_args()
+    if not args.api_key:
+        parser.error("번역에 필요한 API 키를 --api-key 또는 OPENAI_API_KEY 로 지정하세요.")
+
+    for dataset_file in args.datasets:
+        path = build_corpus_artifact(dataset_file, args.api_key, args.embedding_provider,
+                                     args.translation_memory)
+        print(f"{dataset_file}: {path}")
+
+
+if __name__ == "__main__":
+    main()
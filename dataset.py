@@ -0,0 +1,249 @@
+# Dataset Load & Pre-processing
+# -----------------------------------------------------------------------------
+# 건축 / 토목 / 플랜트 위험성평가 Excel 데이터셋을 읽어 공통 컬럼으로 정규화합니다 (normalize.py).
+# Streamlit 에 의존하지 않으므로 앱, Offline Build 명령 등에서 함께 사용합니다.
+# 정규화 결과는 데이터셋 파일 옆 Columnar 캐시(예: 건축.dataset.feather, 비압축 Arrow IPC)로
+# 저장되어, 다음 로드부터는 Excel 파싱 없이 memory-map 으로 읽습니다.
+#  - 캐시 유효성: 원본 (mtime, 크기) 일치 → 바로 사용, 불일치 시 SHA-256 비교 후 재생성 여부 결정
+# 사용 예) 데이터셋을 미리 변환하려면
+#   python dataset.py 건축 토목 플랜트
+# -----------------------------------------------------------------------------
+
+import argparse
+import hashlib
+import os
+
+import pandas as pd
+
+from embedding_store import content_ids
+from normalize import build_content, determine_grades, normalize_dataset
+
+# 정규화 로직(normalize.normalize_dataset) 을 바꾸면 값을 올려 기존 Columnar 캐시를 무효화
+DATASET_CACHE_VERSION = "1"
+
+
+def resolve_dataset_filename(selected_dataset_name: str, language: str) -> str:
+    """언어별 데이터셋 이름을 확장자 없는 실제 파일명으로 매핑"""
+    if language == "Korean":
+        dataset_mapping = {
+            "건축": "건축", "토목": "토목", "플랜트": "플랜트"
+        }
+    elif language == "English": 
+        dataset_mapping = {
+            "Architecture": "건축", "Civil": "토목", "Plant": "플랜트"
+        }
+    elif language == "Chinese":
+        dataset_mapping = {
+            "建筑": "건축", "土木": "토목", "工厂": "플랜트"
+        }
+    else:
+        dataset_mapping = {
+            "건축": "건축", "토목": "토목", "플랜트": "플랜트"
+        }
+    return dataset_mapping.get(selected_dataset_name, "건축")
+
+
+def _find_dataset_file(actual_filename: str) -> str | None:
+    """확장자 없는 파일명의 실제 데이터셋 파일 (.xlsx 우선, .xls). 없으면 None"""
+    for ext in (".xlsx", ".xls"):
+        if os.path.exists(f"{actual_filename}{ext}"):
+            return f"{actual_filename}{ext}"
+    return None
+
+
+def resolve_dataset_path(selected_dataset_name: str, language: str) -> str | None:
+    """언어별 데이터셋 이름을 실제 파일 경로(.xlsx/.xls)로 변환. 파일이 없으면 None"""
+    return _find_dataset_file(resolve_dataset_filename(selected_dataset_name, language))
+
+
+def dataset_file_signature(dataset_path: str | None) -> tuple[int, int] | None:
+    """데이터셋 파일 변경 감지용 (mtime_ns, size) 반환. 파일이 없으면 None"""
+    if not dataset_path or not os.path.exists(dataset_path):
+        return None
+    stat = os.stat(dataset_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """파일 내용의 SHA-256 해시(hex)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dataset_cache_path(dataset_path: str) -> str:
+    """데이터셋 파일 옆 Columnar 캐시 경로 (예: 건축.dataset.feather)"""
+    return f"{os.path.splitext(dataset_path)[0]}.dataset.feather"
+
+
+def _cache_metadata(dataset_path: str, sha256: str | None = None) -> dict[bytes, bytes]:
+    """캐시 유효성 판단용 원본 파일 정보 (Arrow schema metadata)"""
+    stat = os.stat(dataset_path)
+    return {
+        b"version": DATASET_CACHE_VERSION.encode(),
+        b"source_mtime_ns": str(stat.st_mtime_ns).encode(),
+        b"source_size": str(stat.st_size).encode(),
+        b"source_sha256": (sha256 or file_sha256(dataset_path)).encode(),
+    }
+
+
+def write_dataset_cache(df: pd.DataFrame, dataset_path: str, sha256: str | None = None) -> str:
+    """정규화된 DataFrame 을 비압축 Feather(Arrow IPC) 로 저장 (memory-map 로드 가능) 후 경로 반환"""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}), **_cache_metadata(dataset_path, sha256)
+    })
+    path = dataset_cache_path(dataset_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_dataset_cache(dataset_path: str) -> pd.DataFrame | None:
+    """유효한 Columnar 캐시가 있으면 memory-map 으로 읽어 반환, 없거나 원본이 바뀌었으면 None
+
+    mtime / 크기가 달라도 내용(SHA-256)이 같으면 (복사, touch 등) 캐시를 사용하고 메타데이터만 갱신합니다.
+    """
+    path = dataset_cache_path(dataset_path)
+    if not os.path.exists(path):
+        return None
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    try:
+        table = feather.read_table(path, memory_map=True)
+    except (OSError, pa.ArrowException):
+        return None
+    meta = table.schema.metadata or {}
+    if meta.get(b"version") != DATASET_CACHE_VERSION.encode():
+        return None
+    stat = os.stat(dataset_path)
+    df = table.to_pandas()
+    if (meta.get(b"source_mtime_ns") == str(stat.st_mtime_ns).encode()
+            and meta.get(b"source_size") == str(stat.st_size).encode()):
+        return df
+    sha256 = file_sha256(dataset_path)
+    if meta.get(b"source_sha256") != sha256.encode():
+        return None
+    write_dataset_cache(df, dataset_path, sha256)
+    return df
+
+
+def read_dataset(actual_filename: str, use_cache: bool = True) -> pd.DataFrame | None:
+    """데이터셋을 읽어 전처리한 DataFrame 반환. 파일이 없으면 None (읽기 오류는 예외 전파)
+
+    use_cache 이면 Columnar 캐시를 우선 사용하고, 없거나 오래된 경우 Excel 을 파싱한 뒤 캐시를 갱신합니다.
+    """
+    dataset_path = _find_dataset_file(actual_filename)
+    if dataset_path is None:
+        return None
+    if use_cache:
+        df = load_dataset_cache(dataset_path)
+        if df is not None:
+            return df
+
+    df = _read_dataset_excel(dataset_path)
+    if use_cache:
+        try:
+            write_dataset_cache(df, dataset_path)
+        except Exception:
+            # 캐시 저장 실패(읽기 전용 폴더, Arrow 변환 불가 값 등)는 무시하고 Excel 결과 사용
+            pass
+    return df
+
+
+def _read_dataset_excel(dataset_path: str) -> pd.DataFrame:
+    """데이터셋 Excel 파일(.xlsx / .xls) 파싱 후 공통 컬럼으로 정규화 (normalize.normalize_dataset)"""
+    # 1️⃣ Excel 파일 읽기 (openpyxl 선호, 실패 시 xlrd 백업)
+    if dataset_path.endswith(".xlsx"):
+        try:
+            df = pd.read_excel(dataset_path, engine='openpyxl')
+        except Exception:
+            df = pd.read_excel(dataset_path, engine='xlrd')
+    else:
+        df = pd.read_excel(dataset_path, engine='xlrd')
+
+    return normalize_dataset(df)
+
+
+def create_sample_data() -> pd.DataFrame:
+    data = {
+        "작업활동 및 내용": [
+            "임시 현장 저장소에서 포크리프트를 이용한 철골 구조재 하역작업",
+            "콘크리트/CMU 블록 설치 작업",
+            "굴착 및 되메우기 작업",
+            "고소 작업대를 이용한 외벽 작업",
+            "용접 작업"
+        ],
+        "유해위험요인 및 환경측면 영향": [
+            "다중 인양으로 인한 적재물 낙하",
+            "불충분한 작업 발판으로 인한 추락",
+            "굴착벽 붕괴로 인한 매몰",
+            "안전대 미착용으로 인한 추락",
+            "용접 흄 및 화재 위험"
+        ],
+        "피해형태 및 환경영향": [
+            "타박상", "골절", "매몰", "추락사", "화상"
+        ],
+        "빈도": [3, 3, 2, 4, 2],
+        "강도": [5, 4, 5, 5, 3],
+        "개선대책": [
+            "1) 다수의 철골재를 함께 인양하지 않도록 관리\n"
+            "2) 치수, 중량, 형상이 다른 재료를 함께 인양하지 않도록 관리",
+            "1) 비계대 누락된 목판 설치\n"
+            "2) 안전대 부착설비 설치 및 사용\n"
+            "3) 비계 변경 시 타공종 외 작업자 작업 금지",
+            "1) 적절한 사면 기울기 유지\n"
+            "2) 굴착면 보강\n"
+            "3) 정기적 지반 상태 점검",
+            "1) 안전대 착용 의무화\n"
+            "2) 작업 전 안전교육 실시\n"
+            "3) 추락방지망 설치",
+            "1) 적절한 환기시설 설치\n"
+            "2) 화재 예방 조치\n"
+            "3) 보호구 착용"
+        ]
+    }
+    df = pd.DataFrame(data)
+    df["T"] = df["빈도"] * df["강도"]
+    df["등급"] = determine_grades(df["T"])
+    return df
+
+
+def build_retriever_pool(df: pd.DataFrame) -> pd.DataFrame:
+    """유사사례 검색 대상 Pool 구성 (약 10% hold-out 제외), content 컬럼 추가
+
+    Pool 의 index 는 content 해시에서 만든 row_id 이며, FAISS 인덱스도 같은 row_id 를 반환하므로
+    검색 결과는 위치가 아닌 pool_df.loc[row_id] 로 조회합니다. row_id 와 hold-out 여부는 각 행의
+    content 로 정해지므로, 행을 추가/수정/삭제해도 나머지 행의 ID 와 Pool 포함 여부는 바뀌지 않습니다.
+    content 가 같은 중복 행은 첫 행만 남깁니다.
+    """
+    pool_df = df.copy()
+    pool_df["content"] = build_content(pool_df)
+    pool_df.index = pd.Index(content_ids(pool_df["content"]), name="row_id")
+    pool_df = pool_df[~pool_df.index.duplicated()]
+    if len(df) > 10:
+        pool_df = pool_df[pool_df.index % 10 != 0]
+    return pool_df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="데이터셋 Excel → Columnar 캐시(.dataset.feather) 변환")
+    parser.add_argument("datasets", nargs="+", help="확장자 없는 데이터셋 파일명 (예: 건축 토목 플랜트)")
+    args = parser.parse_args()
+    for name in args.datasets:
+        dataset_path = _find_dataset_file(name)
+        if dataset_path is None:
+            parser.error(f"데이터셋 파일을 찾을 수 없습니다: {name}.xlsx 또는 {name}.xls")
+        df = _read_dataset_excel(dataset_path)
+        print(f"{write_dataset_cache(df, dataset_path)}: {len(df)}행")
+
+
+if __name__ == "__main__":
+    main()
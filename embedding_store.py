@@ -0,0 +1,182 @@
+# Persistent Embedding Store
+# -----------------------------------------------------------------------------
+# 데이터셋 파일(건축.xlsx / 토목.xlsx / 플랜트.xlsx) 옆에 임베딩 벡터를 float32 .npy 로
+# 저장하여, 세션/프로세스/재시작 간에 재사용합니다.
+#  - Key  : 각 행 `content` 문자열의 SHA-256 해시 + 임베딩 모델명
+#  - Value: L2 정규화 float32 벡터 (memory-mapped 로 로드 → 여러 Worker 가 복사 없이 Cosine 검색에 사용)
+# 새로 추가되었거나 내용이 바뀐 행만 임베딩 API 로 전송합니다.
+# Key 배열과 벡터 배열은 한 파일(.store.npy)에 연속으로 기록하여 한 번의 os.replace 로 함께 교체하고,
+# 여러 프로세스의 "읽기 → 병합 → 쓰기" 는 .store.lock 파일 잠금(fcntl, POSIX)으로 직렬화합니다.
+# 같은 해시에서 FAISS 인덱스의 row ID(content_ids)를 만들어 증분 인덱스 동기화에 사용합니다.
+# -----------------------------------------------------------------------------
+
+import hashlib
+import os
+import re
+from contextlib import contextmanager
+from typing import Callable
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+
+def content_hash(text: str) -> str:
+    """임베딩 대상 문자열의 SHA-256 해시(hex) 반환"""
+    return hashlib.sha256(str(text).encode("utf-8")).hexdigest()
+
+
+def content_ids(texts) -> np.ndarray:
+    """각 문자열의 content 해시 앞 63bit → FAISS row ID (int64, 항상 0 이상)"""
+    return np.fromiter((int(content_hash(t)[:16], 16) >> 1 for t in texts), dtype="int64")
+
+
+def _l2_normalized(vecs: np.ndarray) -> np.ndarray:
+    """행별 L2 정규화 사본 (0 벡터는 그대로)"""
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    return (vecs / np.where(norms > 0, norms, 1)).astype("float32")
+
+
+def read_store(path: str) -> tuple[np.ndarray, np.ndarray]:
+    """저장소 파일(.store.npy)에서 (keys, vectors) 로드. keys 는 메모리로 읽고 vectors 는 memory-map"""
+    with open(path, "rb") as f:
+        keys = np.load(f)
+        version = np.lib.format.read_magic(f)
+        read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                       else np.lib.format.read_array_header_2_0)
+        shape, fortran_order, dtype = read_header(f)
+        offset = f.tell()
+    vecs = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                     order="F" if fortran_order else "C")
+    return keys, vecs
+
+
+class EmbeddingStore:
+    """데이터셋 파일 + 임베딩 모델 단위의 On-disk 임베딩 저장소"""
+
+    def __init__(self, dataset_path: str, model: str):
+        base = os.path.splitext(dataset_path)[0]
+        safe_model = re.sub(r"[^0-9A-Za-z_.-]", "_", model)
+        self.model = model
+        self.prefix = f"{base}.{safe_model}"
+        self.store_path = f"{self.prefix}.store.npy"
+        self.lock_path = f"{self.prefix}.store.lock"
+
+    def index_path(self, backend: str) -> str:
+        """backend 별 FAISS 인덱스 파일 경로 (행 추가/삭제 시 같은 파일을 증분 동기화)"""
+        return f"{self.prefix}.{backend}.faiss"
+
+    @contextmanager
+    def _locked(self):
+        """저장소 갱신(읽기 → 병합 → 쓰기) 구간의 프로세스 간 배타 잠금"""
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self) -> tuple[np.ndarray | None, np.ndarray | None]:
+        """저장된 (keys, vectors) 로드 (vectors 는 memory-map). 없거나 손상 시 (None, None)"""
+        # 이전 형식(keys / vectors 별도 .npy) 저장소도 읽음 → 다음 저장 시 .store.npy 로 옮겨짐
+        legacy_paths = (f"{self.prefix}.keys.npy", f"{self.prefix}.emb.npy")
+        try:
+            if os.path.exists(self.store_path):
+                keys, vecs = read_store(self.store_path)
+            elif all(os.path.exists(path) for path in legacy_paths):
+                keys, vecs = (np.load(path, mmap_mode="r") for path in legacy_paths)
+            else:
+                return None, None
+        except (OSError, ValueError):
+            return None, None
+        if len(keys) != len(vecs):
+            return None, None
+        return keys, vecs
+
+    def _save(self, keys: np.ndarray, vecs: np.ndarray) -> None:
+        """keys, vectors 를 한 임시 파일에 기록 후 os.replace 로 원자적 교체 (기존 mmap 사용자는 이전 파일 유지)"""
+        tmp_path = f"{self.store_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, keys)
+            np.save(f, np.ascontiguousarray(vecs))
+        os.replace(tmp_path, self.store_path)
+
+    def _merge(self, new_keys: np.ndarray, new_vecs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """잠금 상태에서 최신 저장소를 다시 읽어 없는 Key 만 추가 저장 후 (keys, vectors) 반환
+
+        다른 프로세스가 그 사이에 저장한 행을 덮어쓰지 않습니다.
+        """
+        with self._locked():
+            keys, vecs = self._load()
+            if keys is not None:
+                if vecs.shape[1] != new_vecs.shape[1]:
+                    raise ValueError("저장된 임베딩과 차원이 다릅니다.")
+                fresh = ~np.isin(new_keys, keys)
+                new_keys, new_vecs = new_keys[fresh], new_vecs[fresh]
+            if len(new_keys):
+                self._save(new_keys if keys is None else np.concatenate([keys, new_keys]),
+                           new_vecs if vecs is None else np.concatenate([vecs, new_vecs]))
+                keys, vecs = self._load()
+        return keys, vecs
+
+    def _normalize_legacy(self, keys: np.ndarray, vecs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """정규화 전 벡터를 저장한 이전 저장소면 정규화하여 다시 저장 후 (keys, vectors) 반환 (1회)"""
+        if not len(vecs) or abs(float(np.linalg.norm(vecs[0])) - 1.0) < 1e-3:
+            return keys, vecs
+        with self._locked():
+            keys, vecs = self._load()
+            if abs(float(np.linalg.norm(vecs[0])) - 1.0) >= 1e-3:
+                self._save(keys, _l2_normalized(vecs))
+                keys, vecs = self._load()
+        return keys, vecs
+
+    def get_or_embed(self, texts: list[str],
+                     embed_fn: Callable[[list[str]], list[list[float]]]) -> np.ndarray:
+        """texts 순서대로 정렬된 L2 정규화 float32 임베딩 행렬 반환. 저장소에 없는 행만 embed_fn 호출
+
+        임베딩에 실패한 행(0 벡터)은 저장하지 않고 0 벡터 그대로 반환합니다.
+        """
+        if not texts:
+            return np.empty((0, 0), dtype="float32")
+        hashes = [content_hash(t) for t in texts]
+        keys, vecs = self._load()
+        if vecs is not None:
+            keys, vecs = self._normalize_legacy(keys, vecs)
+        positions = {} if keys is None else {k.decode("ascii"): i for i, k in enumerate(keys)}
+
+        missing = {}
+        for h, t in zip(hashes, texts):
+            if h not in positions and h not in missing:
+                missing[h] = t
+
+        if missing:
+            new_embeds = np.asarray(embed_fn(list(missing.values())), dtype="float32")
+            if new_embeds.ndim != 2 or len(new_embeds) != len(missing):
+                raise ValueError("임베딩 결과 개수가 요청한 텍스트 개수와 다릅니다.")
+            new_embeds = _l2_normalized(new_embeds)
+            if vecs is not None and new_embeds.shape[1] != vecs.shape[1]:
+                raise ValueError("저장된 임베딩과 차원이 다릅니다.")
+
+            # 실패한 배치(0 벡터)는 저장하지 않고 이번 호출에서만 사용
+            ok = np.linalg.norm(new_embeds, axis=1) > 0
+            new_keys = np.array([h.encode("ascii") for h in missing], dtype="S64")
+            if ok.any():
+                keys, vecs = self._merge(new_keys[ok], new_embeds[ok])
+                positions = {k.decode("ascii"): i for i, k in enumerate(keys)}
+
+            fallback = {h: new_embeds[i] for i, h in enumerate(missing) if not ok[i]}
+            if fallback:
+                return np.stack([
+                    fallback[h] if h in fallback else vecs[positions[h]] for h in hashes
+                ]).astype("float32")
+
+        rows = np.fromiter((positions[h] for h in hashes), dtype=np.int64, count=len(hashes))
+        # 저장 순서와 동일하면 memory-map 그대로 반환 (복사 없음)
+        if len(rows) == len(vecs) and np.array_equal(rows, np.arange(len(vecs))):
+            return vecs
+        return np.asarray(vecs[rows], dtype="float32")
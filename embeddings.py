@@ -0,0 +1,224 @@
+# Text Embedding (OpenAI "embedding" API)
+# -----------------------------------------------------------------------------
+# 전체 Corpus 를 임베딩하기 위한 배치/동시 요청 처리 모듈입니다.
+#  - Endpoint 제한(요청당 입력 수 / 토큰 수)에 맞춰 배치 분할
+#  - ThreadPool 로 제한된 개수의 요청을 동시에 전송
+#  - 배치 단위 Retry (Exponential Backoff + Jitter)
+#  - progress_callback(done, total) 으로 진행률 보고 (호출 스레드에서 실행)
+# base_url 을 지정하면 로컬 Fake 임베딩 서버로도 테스트할 수 있습니다.
+# OpenAI Client / HTTP 연결 풀은 llm.get_client 로 Chat 호출과 공유하며, 배치별 지연은
+# llm.metrics 의 "embeddings" 항목으로 기록됩니다.
+#
+# EmbeddingProvider 인터페이스로 OpenAI API 와 로컬(Offline) sentence-transformers
+# 다국어 모델을 교체하여 사용할 수 있습니다.
+# -----------------------------------------------------------------------------
+
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable
+
+from llm import LLM_CALL_TIMEOUT, get_client, metrics
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+EMBEDDING_MODEL = "text-embedding-3-large"
+# 한국어 포함 50+ 언어 지원, CPU 에서도 빠른 384차원 모델
+LOCAL_EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+# OpenAI embeddings endpoint 제한: 요청당 최대 2048 개 입력, 약 300k 토큰
+MAX_BATCH_INPUTS = 2048
+MAX_BATCH_TOKENS = 300_000
+
+
+def make_batches(texts: list[str], batch_size: int = 256,
+                 max_batch_tokens: int = MAX_BATCH_TOKENS) -> list[tuple[int, list[str]]]:
+    """(시작 offset, 텍스트 목록) 배치 리스트 생성. 토큰 수는 문자 수로 보수적으로 추정"""
+    batch_size = max(1, min(batch_size, MAX_BATCH_INPUTS))
+    batches = []
+    start, current, current_tokens = 0, [], 0
+    for i, text in enumerate(texts):
+        est_tokens = max(1, len(text))
+        if current and (len(current) >= batch_size or current_tokens + est_tokens > max_batch_tokens):
+            batches.append((start, current))
+            start, current, current_tokens = i, [], 0
+        current.append(text)
+        current_tokens += est_tokens
+    if current:
+        batches.append((start, current))
+    return batches
+
+
+def _embed_batch(client: "OpenAI", batch: list[str], model: str,
+                 max_retries: int, backoff_base: float) -> list[list[float]]:
+    """단일 배치 임베딩. 실패 시 backoff_base × 2^attempt (+jitter) 초 대기 후 재시도"""
+    for attempt in range(max_retries):
+        try:
+            with metrics.measure("embeddings"):
+                resp = client.embeddings.create(model=model, input=batch)
+            return [item.embedding for item in sorted(resp.data, key=lambda d: d.index)]
+        except Exception:
+            if attempt == max_retries - 1:
+                raise
+            time.sleep(backoff_base * (2 ** attempt) + random.uniform(0, backoff_base))
+    return []
+
+
+def embed_texts_with_openai(texts: list[str], api_key: str, model: str = EMBEDDING_MODEL,
+                            base_url: str | None = None, batch_size: int = 256,
+                            max_workers: int = 4, max_retries: int = 5, backoff_base: float = 1.0,
+                            timeout: float = LLM_CALL_TIMEOUT,
+                            progress_callback: Callable[[int, int], None] | None = None) -> list[list[float]]:
+    """OpenAI "embedding" 엔드포인트 호출하여 텍스트 임베딩을 입력 순서대로 반환합니다.
+
+    재시도 후에도 실패한 배치는 0 벡터로 채우며, 모든 배치가 실패하면 RuntimeError 를 발생시킵니다.
+    timeout 은 요청(시도) 1회의 HTTP 대기 한도(초)입니다.
+    """
+    if not api_key:
+        raise ValueError("API 키가 설정되어 있지 않습니다.")
+    if not texts:
+        return []
+
+    processed = [str(t).replace("\n", " ").strip() or " " for t in texts]
+    batches = make_batches(processed, batch_size=batch_size)
+    # 재시도는 _embed_batch 에서 일괄 관리 (SDK 내부 재시도 비활성화)
+    client = get_client(api_key, base_url, timeout=timeout, max_retries=0)
+
+    results: list[list[float] | None] = [None] * len(processed)
+    errors = []
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {
+            pool.submit(_embed_batch, client, batch, model, max_retries, backoff_base): (start, batch)
+            for start, batch in batches
+        }
+        for future in as_completed(futures):
+            start, batch = futures[future]
+            try:
+                for offset, emb in enumerate(future.result()):
+                    results[start + offset] = emb
+            except Exception as e:
+                errors.append(f"배치 {start}: {e}")
+            done += len(batch)
+            if progress_callback:
+                progress_callback(done, len(processed))
+
+    dim = next((len(r) for r in results if r is not None), 0)
+    if dim == 0:
+        raise RuntimeError(f"임베딩 생성 실패: {'; '.join(errors)}")
+    return [r if r is not None else [0.0] * dim for r in results]
+
+
+# -----------------------------------------------------------------------------
+# Embedding Provider
+# -----------------------------------------------------------------------------
+
+class EmbeddingProvider:
+    """임베딩 Provider 공통 인터페이스"""
+
+    name = ""
+    model = ""
+    # True 이면 한국어 등 원문 쿼리를 번역 없이 바로 임베딩해도 됨
+    multilingual_query = False
+
+    def embed(self, texts: list[str],
+              progress_callback: Callable[[int, int], None] | None = None) -> list[list[float]]:
+        raise NotImplementedError
+
+    def embed_query(self, text: str, timeout: float | None = None) -> list[list[float]]:
+        """검색 쿼리 1건 임베딩. timeout 을 지정하면 Corpus 용 재시도 정책 대신 그 안에 끝나도록 요청
+
+        기본 구현은 embed 를 그대로 사용합니다 (네트워크 호출이 없는 Provider).
+        """
+        return self.embed([text])
+
+    def warm_up(self) -> None:
+        """첫 쿼리 전에 필요한 모델 등을 미리 로드 (기본: 없음)"""
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """OpenAI "embedding" API 기반 Provider"""
+
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str = EMBEDDING_MODEL, **kwargs):
+        self.api_key = api_key
+        self.model = model
+        self.kwargs = kwargs
+
+    def embed(self, texts: list[str],
+              progress_callback: Callable[[int, int], None] | None = None) -> list[list[float]]:
+        return embed_texts_with_openai(texts, self.api_key, model=self.model,
+                                       progress_callback=progress_callback, **self.kwargs)
+
+    def embed_query(self, text: str, timeout: float | None = None) -> list[list[float]]:
+        if timeout is None:
+            return self.embed([text])
+        # 쿼리 1건은 재시도 없이 1회 요청, HTTP 대기도 timeout 으로 제한 (Corpus: 5회 × 60초)
+        kwargs = {**self.kwargs, "max_workers": 1, "max_retries": 1, "timeout": timeout}
+        return embed_texts_with_openai([text], self.api_key, model=self.model, **kwargs)
+
+
+@lru_cache(maxsize=4)
+def _load_sentence_transformer(model: str, quantize: bool):
+    """프로세스당 1회 모델 로드 (torch / sentence-transformers 는 사용 시점에 import)"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st_model = SentenceTransformer(model, device="cpu")
+    if quantize:
+        # Linear 계층 동적 INT8 양자화: CPU 추론 속도 향상 및 메모리 절감
+        st_model = torch.quantization.quantize_dynamic(st_model, {torch.nn.Linear}, dtype=torch.qint8)
+    return st_model
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """로컬 CPU sentence-transformers 다국어 모델 Provider (네트워크 호출 없음)"""
+
+    name = "local"
+    multilingual_query = True
+
+    def __init__(self, model: str = LOCAL_EMBEDDING_MODEL, batch_size: int = 64,
+                 num_threads: int | None = None, quantize: bool = False):
+        self.model = f"{model}-int8" if quantize else model
+        self.base_model = model
+        self.batch_size = batch_size
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self.quantize = quantize
+
+    def warm_up(self) -> None:
+        # 모든 벡터를 저장소에서 읽으면 embed 가 호출되지 않으므로, 첫 쿼리 임베딩 대기 한도 안에
+        # torch / 모델 가중치 로드가 들어가지 않도록 인덱스 구성 시 로드
+        _load_sentence_transformer(self.base_model, self.quantize)
+
+    def embed(self, texts: list[str],
+              progress_callback: Callable[[int, int], None] | None = None) -> list[list[float]]:
+        import torch
+
+        torch.set_num_threads(self.num_threads)
+        st_model = _load_sentence_transformer(self.base_model, self.quantize)
+        processed = [str(t).replace("\n", " ").strip() for t in texts]
+        embeddings = []
+        for i in range(0, len(processed), self.batch_size):
+            batch = processed[i : i + self.batch_size]
+            vecs = st_model.encode(batch, batch_size=self.batch_size, convert_to_numpy=True,
+                                   show_progress_bar=False)
+            embeddings.extend(vecs.astype("float32").tolist())
+            if progress_callback:
+                progress_callback(len(embeddings), len(processed))
+        return embeddings
+
+
+EMBEDDING_PROVIDERS = ("openai", "local")
+
+
+def get_embedding_provider(name: str, api_key: str | None = None, **kwargs) -> EmbeddingProvider:
+    """Provider 이름("openai" | "local")으로 EmbeddingProvider 생성"""
+    if name == "openai":
+        return OpenAIEmbeddingProvider(api_key, **kwargs)
+    if name == "local":
+        return LocalEmbeddingProvider(**kwargs)
+    raise ValueError(f"지원하지 않는 임베딩 Provider 입니다: {name} (지원: {', '.join(EMBEDDING_PROVIDERS)})")
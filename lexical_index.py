@@ -0,0 +1,101 @@
+# Lexical Index (문자 n-gram BM25)
+# -----------------------------------------------------------------------------
+# 임베딩 검색은 "포크리프트", "고소작업대" 같은 장비명의 정확한 일치를 놓치기 쉽고,
+# 쿼리마다 임베딩 API 호출이 필요합니다. 이 모듈은 Pool 의 한국어 컬럼을 문자 2/3-gram 으로
+# 나눈 메모리 내 역색인(inverted index)으로 BM25 검색을 수행합니다.
+#  - 공백을 제거한 뒤 n-gram 을 만들므로 "고소 작업대" 와 "고소작업대" 가 같은 n-gram 을 가짐
+#  - 문서별 BM25 가중치를 구성 시 미리 계산 → 쿼리는 posting 합산(np.bincount)만 수행
+#  - 한국어 컬럼 외에 영어 등 다른 언어 텍스트도 같은 방식으로 색인됨
+#  - reciprocal_rank_fusion 으로 FAISS 검색 순위와 결합 (Hybrid Retrieval)
+# 임베딩 Endpoint 가 느리거나 장애일 때는 이 인덱스만으로 유사사례를 검색할 수 있습니다.
+# -----------------------------------------------------------------------------
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# 색인할 한국어 컬럼 / n-gram 길이 / BM25 파라미터 / RRF 상수
+LEXICAL_COLUMNS = ["작업활동 및 내용", "유해위험요인 및 환경측면 영향", "피해형태 및 환경영향"]
+NGRAM_SIZES = (2, 3)
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+
+_SEPARATORS = re.compile(r"[\s\W_]+")
+
+
+def char_ngrams(text: str, sizes: tuple[int, ...] = NGRAM_SIZES) -> list[str]:
+    """공백/구두점을 제거한 소문자 문자열의 문자 n-gram 목록 (n 보다 짧으면 문자열 전체)"""
+    compact = _SEPARATORS.sub("", str(text).lower())
+    if not compact:
+        return []
+    grams = [compact[i:i + n] for n in sizes for i in range(len(compact) - n + 1)]
+    return grams or [compact]
+
+
+class LexicalIndex:
+    """Pool DataFrame(row_id index)의 한국어 컬럼에 대한 문자 n-gram BM25 역색인"""
+
+    def __init__(self, pool_df: pd.DataFrame, columns: list[str] | None = None):
+        columns = [c for c in (columns or LEXICAL_COLUMNS) if c in pool_df.columns]
+        # 행 단위 apply 대신 컬럼 목록을 zip 하여 join (normalize.build_content 와 같은 방식)
+        texts = [" ".join(row) for row in zip(*(pool_df[c].fillna("").astype(str).tolist() for c in columns))]
+        texts = texts if columns else [""] * len(pool_df)
+        self.row_ids = pool_df.index.to_numpy(dtype="int64")
+
+        # 전체 (문서, n-gram) 쌍을 factorize → (문서, term) 별 tf 를 np.unique 로 집계
+        grams = [char_ngrams(text) for text in texts]
+        lengths = np.fromiter(map(len, grams), dtype="int64", count=len(grams))
+        codes, vocabulary = pd.factorize(np.array([g for doc in grams for g in doc], dtype=object))
+        n_docs, n_terms = len(grams), len(vocabulary)
+        pairs, tfs = np.unique(np.repeat(np.arange(n_docs, dtype="int64"), lengths) * n_terms + codes,
+                               return_counts=True)
+        docs, terms = pairs // n_terms, pairs % n_terms
+
+        # term → posting 목록 (문서 번호, BM25 가중치) 을 term 순 CSR 형태로 저장
+        order = np.argsort(terms, kind="stable")
+        docs, terms, tfs = docs[order], terms[order], tfs[order]
+        df = np.bincount(terms, minlength=n_terms)
+        idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        avg_length = float(lengths.mean()) if n_docs and lengths.mean() > 0 else 1.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[docs] / avg_length)
+        self.vocabulary = {term: i for i, term in enumerate(vocabulary)}
+        self.offsets = np.concatenate([[0], np.cumsum(df)])
+        self.docs = docs.astype("int32")
+        self.weights = (idf[terms] * tfs * (BM25_K1 + 1) / (tfs + norm)).astype("float32")
+
+    def __len__(self) -> int:
+        return len(self.row_ids)
+
+    def search(self, query: str, k: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """BM25 점수 상위 k 개의 (row_id, 점수, 쿼리 n-gram 일치율) 반환 (점수 0 인 행 제외)
+
+        일치율은 쿼리의 서로 다른 n-gram 중 해당 행에 있는 비율(0~1)입니다.
+        """
+        query_terms = set(char_ngrams(query))
+        terms = [self.vocabulary[t] for t in query_terms if t in self.vocabulary]
+        empty = np.empty(0, dtype="int64"), np.empty(0, dtype="float32"), np.empty(0, dtype="float32")
+        if not terms or not len(self):
+            return empty
+        spans = [np.arange(self.offsets[t], self.offsets[t + 1]) for t in terms]
+        positions = np.concatenate(spans)
+        docs = self.docs[positions]
+        scores = np.bincount(docs, weights=self.weights[positions], minlength=len(self))
+        matched = np.bincount(docs, minlength=len(self))
+
+        k = min(k, int((scores > 0).sum()))
+        if k == 0:
+            return empty
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return self.row_ids[top], scores[top].astype("float32"), (matched[top] / len(query_terms)).astype("float32")
+
+
+def reciprocal_rank_fusion(rankings: list[list[int]], k: int = RRF_K) -> list[tuple[int, float]]:
+    """여러 검색 결과 순위(row_id 목록)를 RRF 점수 Σ 1 / (k + rank) 내림차순으로 결합"""
+    fused: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row_id in enumerate(ranking, start=1):
+            fused[row_id] = fused.get(row_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,281 @@
+# GPT Chat Completion
+# -----------------------------------------------------------------------------
+# OpenAI Chat Completion 호출 래퍼 (Retry 포함). Streamlit 에 의존하지 않으며,
+# 앱에서는 stream.generate_with_gpt 가 오류를 화면에 표시하도록 감싸서 사용합니다.
+# 서로 독립적인 호출(번역 등)은 run_parallel 로 동시 실행하여 전체 지연을
+# "모든 호출의 합" 이 아닌 "가장 느린 호출" 수준으로 줄입니다.
+# 모든 요청은 프로세스 전역 RateLimiter 를 거치므로, 일괄 평가처럼 호출이 몰려도
+# 분당 요청 한도(LLM_REQUESTS_PER_MINUTE)를 넘지 않습니다.
+# OpenAI Client 는 (API 키, base URL) 별로 1개만 만들어 모든 호출(Chat / Embedding)이 공유하며,
+# 하나의 HTTP 연결 풀(Keep-alive, h2 설치 시 HTTP/2)을 재사용합니다.
+# 호출 종류별 지연 시간은 metrics 에 누적됩니다 (metrics.summary()).
+# cache(ResponseCache) 를 넘기면 동일한 요청(모델, Prompt, 샘플링 설정)의 응답을 재사용합니다.
+# openai / httpx 는 import 비용이 커서(약 1초) 첫 Client 생성 시점에 import 합니다.
+# -----------------------------------------------------------------------------
+
+import importlib.util
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+
+import numpy as np
+
+from response_cache import ResponseCache
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+GPT_MODEL = "gpt-4o"
+SYSTEM_PROMPT = (
+    "You are a construction site risk assessment expert. "
+    "Provide accurate and practical responses in English."
+)
+# 한 단계(fan-out) 에서 동시에 실행할 최대 호출 수 / 호출당 HTTP 타임아웃(초)
+LLM_MAX_CONCURRENCY = 8
+LLM_CALL_TIMEOUT = 60.0
+# 프로세스 전체 GPT 요청 속도 제한 (분당 요청 수, 0 이면 제한 없음)
+LLM_REQUESTS_PER_MINUTE = 300
+# 공유 HTTP 연결 풀: 최대 연결 수 / 유지할 Keep-alive 연결 수 / 유휴 연결 유지 시간(초)
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+HTTP_KEEPALIVE_EXPIRY = 60.0
+
+
+class LLMError(RuntimeError):
+    """재시도 후에도 GPT 호출이 실패한 경우"""
+
+
+class RateLimiter:
+    """Token Bucket 속도 제한 (thread-safe). burst 개까지는 즉시 통과, 이후 분당 per_minute 개"""
+
+    def __init__(self, per_minute: float, burst: int = LLM_MAX_CONCURRENCY):
+        self.rate = per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """요청 1건을 보낼 수 있을 때까지 대기"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_s = (1 - self._tokens) / self.rate
+            time.sleep(wait_s)
+
+
+rate_limiter = RateLimiter(LLM_REQUESTS_PER_MINUTE)
+
+
+class LatencyMetrics:
+    """호출 종류별 지연 시간(초) 누적 (thread-safe, 종류별 최근 max_samples 개로 분위수 계산)"""
+
+    def __init__(self, max_samples: int = 2000):
+        self.max_samples = max_samples
+        self._samples: dict[str, deque] = {}
+        self._counts: dict[str, int] = {}
+        self._errors: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, seconds: float, ok: bool = True) -> None:
+        with self._lock:
+            self._samples.setdefault(kind, deque(maxlen=self.max_samples)).append(seconds)
+            self._counts[kind] = self._counts.get(kind, 0) + 1
+            if not ok:
+                self._errors[kind] = self._errors.get(kind, 0) + 1
+
+    @contextmanager
+    def measure(self, kind: str) -> Iterator[None]:
+        """with 블록 실행 시간을 kind 로 기록 (예외 발생 시 오류로 집계)"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.record(kind, time.perf_counter() - start, ok=False)
+            raise
+        self.record(kind, time.perf_counter() - start)
+
+    def summary(self) -> dict[str, dict]:
+        """{kind: {count, errors, mean_ms, p50_ms, p95_ms, max_ms}}"""
+        with self._lock:
+            snapshot = {kind: np.array(samples) for kind, samples in self._samples.items()}
+            counts, errors = dict(self._counts), dict(self._errors)
+        return {
+            kind: {
+                "count": counts[kind],
+                "errors": errors.get(kind, 0),
+                "mean_ms": round(float(arr.mean()) * 1000, 1),
+                "p50_ms": round(float(np.percentile(arr, 50)) * 1000, 1),
+                "p95_ms": round(float(np.percentile(arr, 95)) * 1000, 1),
+                "max_ms": round(float(arr.max()) * 1000, 1),
+            }
+            for kind, arr in snapshot.items()
+        }
+
+
+metrics = LatencyMetrics()
+
+
+@lru_cache(maxsize=1)
+def _shared_http_client():
+    """모든 OpenAI Client 가 공유하는 HTTP 연결 풀 (h2 패키지가 있으면 HTTP/2)"""
+    from openai import DefaultHttpxClient
+
+    try:
+        import httpx
+    except ImportError:  # httpx2 기반 openai 배포판
+        import httpx2 as httpx
+
+    return DefaultHttpxClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+@lru_cache(maxsize=32)
+def get_client(api_key: str, base_url: str | None = None, timeout: float = LLM_CALL_TIMEOUT,
+               max_retries: int = 2) -> "OpenAI":
+    """(API 키, base URL) 별 공유 OpenAI Client (thread-safe). 호출마다 새로 만들지 않고 연결을 재사용
+
+    max_retries 는 SDK 내부 재시도 횟수입니다 (자체 재시도를 하는 호출부는 0 으로 지정).
+    """
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=max_retries,
+                  http_client=_shared_http_client())
+
+
+def _request_params(prompt: str, model: str, max_tokens: int) -> dict:
+    """Chat Completion 공통 요청 파라미터 (System Prompt + 샘플링 설정)"""
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system",  "content": SYSTEM_PROMPT},
+            {"role": "user",    "content": prompt}
+        ],
+        "temperature": 0.1,
+        "max_tokens": max_tokens,
+        "top_p": 0.9,
+    }
+
+
+def chat_completion(prompt: str, api_key: str, model: str = GPT_MODEL, max_retries: int = 3,
+                    on_retry: Callable[[int, int, Exception], None] | None = None,
+                    timeout: float = LLM_CALL_TIMEOUT, max_tokens: int = 700,
+                    cache: ResponseCache | None = None) -> str:
+    """GPT 응답 텍스트 반환. max_retries 회 실패 시 LLMError 발생
+
+    on_retry(attempt, max_retries, error) 는 재시도 직전에 호출됩니다.
+    cache 에 같은 요청의 응답이 있으면 API 를 호출하지 않습니다.
+    """
+    if not api_key:
+        raise LLMError("API 키가 설정되어 있지 않습니다.")
+    params = _request_params(prompt, model, max_tokens)
+    cached = cache.get(params) if cache else None
+    if cached is not None:
+        return cached
+    client = get_client(api_key, timeout=timeout)
+    for attempt in range(max_retries):
+        rate_limiter.acquire()
+        try:
+            with metrics.measure("chat"):
+                resp = client.chat.completions.create(**params)
+            text = resp.choices[0].message.content.strip()
+            if cache:
+                cache.put(params, text)
+            return text
+        except Exception as e:
+            if attempt == max_retries - 1:
+                raise LLMError(f"GPT 호출 오류 ({attempt+1}/{max_retries}): {e}") from e
+            if on_retry:
+                on_retry(attempt + 1, max_retries, e)
+    return ""
+
+
+def stream_chat_completion(prompt: str, api_key: str, model: str = GPT_MODEL, max_retries: int = 3,
+                           timeout: float = LLM_CALL_TIMEOUT, max_tokens: int = 700,
+                           cache: ResponseCache | None = None) -> Iterator[str]:
+    """GPT 응답을 토큰(delta) 단위로 yield 하는 Streaming 호출
+
+    스트림 연결 전 실패는 max_retries 회까지 재시도하며, 이후 실패 시 LLMError 를 발생시킵니다.
+    cache 에 같은 요청의 응답이 있으면 전체 텍스트를 한 번에 yield 하고, 스트림이 끝까지
+    완료된 응답만 cache 에 저장합니다. chat_completion 과 같은 Key 를 사용합니다.
+    """
+    if not api_key:
+        raise LLMError("API 키가 설정되어 있지 않습니다.")
+    params = _request_params(prompt, model, max_tokens)
+    cached = cache.get(params) if cache else None
+    if cached is not None:
+        yield cached
+        return
+    client = get_client(api_key, timeout=timeout)
+    for attempt in range(max_retries):
+        rate_limiter.acquire()
+        start = time.perf_counter()
+        try:
+            stream = client.chat.completions.create(**params, stream=True)
+            break
+        except Exception as e:
+            metrics.record("chat_stream", time.perf_counter() - start, ok=False)
+            if attempt == max_retries - 1:
+                raise LLMError(f"GPT 호출 오류 ({attempt+1}/{max_retries}): {e}") from e
+    # 첫 토큰까지의 지연(chat_stream_first_token)과 전체 스트림 시간(chat_stream)을 따로 기록
+    parts = []
+    try:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                if not parts:
+                    metrics.record("chat_stream_first_token", time.perf_counter() - start)
+                parts.append(chunk.choices[0].delta.content)
+                yield parts[-1]
+    except Exception as e:
+        metrics.record("chat_stream", time.perf_counter() - start, ok=False)
+        raise LLMError(f"GPT 스트리밍 오류: {e}") from e
+    metrics.record("chat_stream", time.perf_counter() - start)
+    if cache:
+        cache.put(params, "".join(parts).strip())
+
+
+def generate_or_empty(prompt: str, api_key: str, model: str = GPT_MODEL, max_retries: int = 3) -> str:
+    """chat_completion 과 동일하나 실패 시 빈 문자열 반환 (번역 등 원문 fallback 용)"""
+    try:
+        return chat_completion(prompt, api_key, model=model, max_retries=max_retries)
+    except LLMError:
+        return ""
+
+
+def run_parallel(tasks: list[Callable[[], Any]], max_workers: int = LLM_MAX_CONCURRENCY,
+                 timeout: float | None = None) -> list[Any]:
+    """독립적인 호출들을 최대 max_workers 개씩 동시 실행하여 입력 순서대로 결과 반환
+
+    예외가 발생했거나 timeout(초, 전체 단계 기준) 안에 끝나지 않은 호출의 결과는 None 입니다.
+    """
+    if not tasks:
+        return []
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks))))
+    futures = [pool.submit(task) for task in tasks]
+    wait(futures, timeout=timeout)
+    # 시간 초과된 호출은 기다리지 않고 버림 (대기 중인 작업은 취소)
+    pool.shutdown(wait=False, cancel_futures=True)
+    results = []
+    for future in futures:
+        if future.done() and not future.cancelled() and future.exception() is None:
+            results.append(future.result())
+        else:
+            results.append(None)
+    return results
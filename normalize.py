@@ -0,0 +1,119 @@
+# Vectorized Dataset Normalization
+# -----------------------------------------------------------------------------
+# 데이터셋 정규화(컬럼명 통일, 빈도/강도 → T / 등급, 결측치 보정)와 임베딩 대상 content
+# 문자열 생성을 컬럼 단위 연산으로 수행합니다. 행마다 Series 를 만들어 Python 함수를 호출하는
+# DataFrame.apply 를 사용하지 않으므로 행 수가 늘어도 NumPy / C 루프 속도로 처리됩니다.
+# Streamlit / 세션 상태에 의존하지 않습니다 (결과 언어는 인자로 전달).
+# 비교 벤치마크)
+#   python bench_normalize.py --rows 100000
+# -----------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+# 위험 등급 구간 (T = 빈도 × 강도): (하한, 상한, 등급)
+GRADE_BANDS = [(16, 25, "A"), (10, 15, "B"), (5, 9, "C"), (3, 4, "D"), (1, 2, "E")]
+
+# 원본 Excel 의 한/영 혼용 Column 명 → 공통 Column 명
+COLUMN_MAPPING = {
+    "작업활동 및 내용\nWork & Contents": "작업활동 및 내용",
+    "유해위험요인 및 환경측면 영향\nHazard & Risk": "유해위험요인 및 환경측면 영향",
+    "피해형태 및 환경영향\nDamage & Effect": "피해형태 및 환경영향",
+    "개선대책 및 세부관리방안\nCorrective Action": "개선대책"
+}
+REQUIRED_COLUMNS = [
+    "작업활동 및 내용",
+    "유해위험요인 및 환경측면 영향",
+    "피해형태 및 환경영향",
+    "빈도",
+    "강도",
+    "T",
+    "등급",
+    "개선대책"
+]
+
+# 값 1개를 str() 로 변환하는 ufunc (object 배열 전체를 C 루프로 변환, 고정 길이 유니코드 배열을 만들지 않음)
+_to_str = np.frompyfunc(str, 1, 1)
+
+
+def _unknown_grade(language: str) -> str:
+    return 'Unknown' if language != 'Korean' else '알 수 없음'
+
+
+def determine_grade(value: int, language: str = "Korean") -> str:
+    """T 값(빈도×강도)에 따라 위험 등급(A~E)을 반환합니다."""
+    for low, high, grade in GRADE_BANDS:
+        if low <= value <= high:
+            return grade
+    return _unknown_grade(language)
+
+
+def determine_grades(values: pd.Series, language: str = "Korean") -> pd.Series:
+    """determine_grade 의 Vectorized 버전 (T 컬럼 전체를 np.select 로 한 번에 등급 변환)"""
+    t = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64")
+    conditions = [(t >= low) & (t <= high) for low, high, _ in GRADE_BANDS]
+    grades = np.select(conditions, [grade for _, _, grade in GRADE_BANDS], default=_unknown_grade(language))
+    return pd.Series(grades, index=values.index, dtype=object)
+
+
+def build_content(df: pd.DataFrame) -> pd.Series:
+    """행의 모든 컬럼 값을 공백으로 이어붙인 임베딩 대상 문자열(content) 생성
+
+    행 단위 " ".join(row.values.astype(str)) 와 같은 문자열(같은 dtype 승격, NaN → "nan")을
+    만들되, 값 → 문자열 변환은 컬럼 단위로 수행하고 행마다 Series 를 만들지 않습니다.
+    임베딩 저장소 Key(content 해시)가 바뀌지 않도록 결과가 달라지면 안 됩니다.
+    """
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+        # 숫자 컬럼만 있으면 행 값이 공통 dtype(float 등)으로 승격되므로 그대로 따름
+        columns = list(df.to_numpy().T)
+    else:
+        columns = [df.iloc[:, j].to_numpy(dtype=object) for j in range(df.shape[1])]
+    parts = [_to_str(column) for column in columns]
+    return pd.Series([" ".join(row) for row in zip(*parts)], index=df.index, dtype=object)
+
+
+def normalize_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """원본 데이터셋 DataFrame 을 공통 컬럼(REQUIRED_COLUMNS) 으로 정규화"""
+    df = df.copy()
+
+    # 2️⃣ 필요 없는 컬럼 & NA 행 제거
+    if "삭제 Del" in df.columns:
+        df.drop(["삭제 Del"], axis=1, inplace=True)
+    df = df.dropna(how='all')
+
+    # 3️⃣ 한/영 혼용 Column 명 정규화        
+    df.rename(columns=COLUMN_MAPPING, inplace=True)
+
+    # 4️⃣ 빈도/강도 numeric 변환 & 기본값 보정        
+    for col in ["빈도", "강도"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    if '빈도' not in df.columns:
+        df['빈도'] = 3
+    if '강도' not in df.columns:
+        df['강도'] = 3
+
+    # 5️⃣ T 값, 등급 계산 및 결측치 채우기
+    df["T"] = df["빈도"] * df["강도"]
+    df["등급"] = determine_grades(df["T"])
+
+    # 6️⃣ 개선대책 컬럼 보정
+    if "개선대책" not in df.columns:
+        alt_cols = [c for c in df.columns if "개선" in c or "Corrective" in c]
+        if alt_cols:
+            df.rename(columns={alt_cols[0]: "개선대책"}, inplace=True)
+        else:
+            df["개선대책"] = "안전 교육 실시 및 보호구 착용"
+
+    # 7️⃣ 최종 컬럼 순서 정의 & NA 채우기        
+    final_cols = [col for col in REQUIRED_COLUMNS if col in df.columns]
+    df = df[final_cols]
+
+    df = df.fillna({
+        "작업활동 및 내용": "일반 작업",
+        "유해위험요인 및 환경측면 영향": "일반적 위험",
+        "피해형태 및 환경영향": "부상",
+        "개선대책": "안전 조치 수행"
+    })
+    return df
@@ -0,0 +1,169 @@
+# Risk Assessment Report Export
+# -----------------------------------------------------------------------------
+# 평가 결과를 Doosan 표준 양식 Excel(작업분석 / 인력 / 장비 / 위험성평가결과 / 유사사례 /
+# 현장 요청사항 시트)로 변환합니다. 앱과 일괄 평가 CLI 가 함께 사용합니다.
+# xlsxwriter 가 없으면 위험성평가결과만 CSV 로 반환합니다.
+# -----------------------------------------------------------------------------
+
+import io
+import warnings
+
+import pandas as pd
+
+
+def build_main_result_df(results: list[dict], current_date: str) -> pd.DataFrame:
+    """평가 결과 목록 → 위험성평가결과 시트 (데이터셋 형식, 결과 1건당 1행)"""
+    return pd.DataFrame({
+        "작업활동 및 내용 Work & Contents": [r["activity"] for r in results],
+        "유해위험요인 및 환경측면 영향 Hazard & Risk": [r["hazard"] for r in results],
+        "EHS": ["S"] * len(results),  # EHS는 "S"로 설정
+        "빈도 Risk Rate": [r["freq"] for r in results],
+        "강도 Severity": [r["intensity"] for r in results],
+        "개선대책 및 세부관리방안 Corrective Action": [r["improvement_plan"] for r in results],
+        "개선담당자 Responsibility": [""] * len(results),  # 개선담당자는 빈칸
+        "개선일자 Correction Due Date": [current_date] * len(results),  # 개선일자는 현재 날짜
+        "빈도 Likelihood": [r["improved_freq"] for r in results],
+        "강도 Severity ": [r["improved_intensity"] for r in results],  # 공백으로 구분
+    })
+
+
+def create_excel_download(results: list[dict], similar_records: list[dict],
+                          job_analysis_df: pd.DataFrame | None = None) -> bytes:
+    """Risk Assessment 결과(1건 이상)를 Doosan 표준 양식 Excel 로 변환
+
+    results 의 각 항목이 위험성평가결과 시트의 한 행이 되며, 일괄 평가 시에는
+    업로드된 작업분석 시트(job_analysis_df)를 첫 번째 시트에 그대로 기록합니다.
+    """
+    output = io.BytesIO()
+    try:
+        # 현재 날짜 가져오기
+        from datetime import datetime
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        
+        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+            workbook = writer.book
+
+            # ─── 1. 작업분석 및 예정공정표 시트 (첫 번째) ─────────────────
+            if job_analysis_df is None:
+                job_analysis_df = pd.DataFrame(columns=[
+                    "순번 No.",
+                    "작업순서 WORK SEQUENCE",
+                    "작업 시작일자 Start Date",
+                    "작업 종료일자 Finish Date"
+                ])
+            job_analysis_df.to_excel(writer, sheet_name="작업분석 및 예정공정표 Job Analysis", index=False)
+            ws_job = writer.sheets["작업분석 및 예정공정표 Job Analysis"]
+            for col_idx in range(len(job_analysis_df.columns)):
+                ws_job.set_column(col_idx, col_idx, 25)
+
+            # ─── 2. 인력 투입계획 시트 (두 번째) ─────────────────
+            manpower_columns = ["작업순서 WORK SEQUENCE"] + [str(i) for i in range(1, 32)]  # 1부터 31까지
+            manpower_df = pd.DataFrame(columns=manpower_columns)
+            manpower_df.to_excel(writer, sheet_name="인력 투입계획 Manpower", index=False)
+            ws_manpower = writer.sheets["인력 투입계획 Manpower"]
+            # 첫 번째 컬럼은 넓게, 나머지는 좁게
+            ws_manpower.set_column(0, 0, 25)
+            for col_idx in range(1, len(manpower_columns)):
+                ws_manpower.set_column(col_idx, col_idx, 8)
+
+            # ─── 3. 건설장비 투입계획 시트 (세 번째) ─────────────────
+            heavy_equipment_df = pd.DataFrame(columns=[
+                "건설장비 Heavy Equipment",
+                "규격 Capacity",
+                "대수 Q'ty",
+                "비고 Remark"
+            ])
+            heavy_equipment_df.to_excel(writer, sheet_name="건설장비 투입계획 Heavy Equipment", index=False)
+            ws_heavy = writer.sheets["건설장비 투입계획 Heavy Equipment"]
+            for col_idx in range(len(heavy_equipment_df.columns)):
+                ws_heavy.set_column(col_idx, col_idx, 25)
+
+            # ─── 4. 기계-기구 투입계획 시트 (네 번째) ─────────────────
+            tools_equipment_df = pd.DataFrame(columns=[
+                "기계/기구 Elec. Tools",
+                "규격 Capacity",
+                "대수 Q'ty",
+                "비고 Remark"
+            ])
+            tools_equipment_df.to_excel(writer, sheet_name="기계-기구 투입계획 Tools & Equipment", index=False)
+            ws_tools = writer.sheets["기계-기구 투입계획 Tools & Equipment"]
+            for col_idx in range(len(tools_equipment_df.columns)):
+                ws_tools.set_column(col_idx, col_idx, 25)
+
+            # ─── 5. 메인 결과를 데이터셋 형식에 맞춰 단일 시트로 생성 (다섯 번째) ─────────────────
+            main_result_df = build_main_result_df(results, current_date)
+            
+            main_result_df.to_excel(writer, sheet_name="위험성평가결과", index=False)
+            ws_main = writer.sheets["위험성평가결과"]
+            
+            # 컬럼 너비 자동 조정
+            for col_idx, column in enumerate(main_result_df.columns):
+                max_length = max(
+                    len(str(column)),
+                    main_result_df[column].astype(str).str.len().max() if not main_result_df[column].empty else 0
+                )
+                ws_main.set_column(col_idx, col_idx, min(max_length + 2, 50))
+
+            # ─── 6. 유사사례 시트 ─────────────────
+            if similar_records:
+                sim_df = pd.DataFrame(similar_records)
+                sim_df["개선 후 빈도"] = sim_df["빈도"].astype(int).apply(lambda x: max(1, x - 1))
+                sim_df["개선 후 강도"] = sim_df["강도"].astype(int).apply(lambda x: max(1, x - 1))
+
+                export_df = pd.DataFrame({
+                    "작업활동 및 내용 Work & Contents": sim_df["작업활동"],
+                    "유해위험요인 및 환경측면 영향 Hazard & Risk": sim_df["유해위험요인"],
+                    "EHS": ["S" for _ in range(len(sim_df))],  # EHS는 "S"로 설정
+                    "빈도 Risk Rate": sim_df["빈도"],
+                    "강도 Severity": sim_df["강도"],
+                    "개선대책 및 세부관리방안 Corrective Action": sim_df["개선대책"],
+                    "개선담당자 Responsibility": ["" for _ in range(len(sim_df))],  # 개선담당자는 빈칸
+                    "개선일자 Correction Due Date": [current_date for _ in range(len(sim_df))],  # 개선일자는 현재 날짜
+                    "빈도 Likelihood": sim_df["개선 후 빈도"],
+                    "강도 Severity ": sim_df["개선 후 강도"],  # 공백으로 구분
+                })
+                if "유사도" in sim_df.columns:
+                    export_df["유사도 Similarity"] = sim_df["유사도"]
+                if "일치율" in sim_df.columns:
+                    export_df["키워드 일치율 Keyword Match"] = sim_df["일치율"]
+                if "데이터셋" in sim_df.columns:
+                    export_df["데이터셋 Dataset"] = sim_df["데이터셋"]
+                export_df.to_excel(writer, sheet_name="유사사례", index=False)
+                ws_sim = writer.sheets["유사사례"]
+                
+                # 유사사례 시트 컬럼 너비 조정
+                for col_idx, column in enumerate(export_df.columns):
+                    max_length = max(
+                        len(str(column)),
+                        export_df[column].astype(str).str.len().max() if not export_df[column].empty else 0
+                    )
+                    ws_sim.set_column(col_idx, col_idx, min(max_length + 2, 50))
+
+            # ─── 7. 현장 간섭 및 요청사항 시트 (마지막) ─────────────────
+            request_df = pd.DataFrame(columns=[
+                "EHS",
+                "현장간섭 및 요청사항 Site Issues & Request",
+                "해당업체(부서) Relevant Party",
+                "완료유무 Status"
+            ])
+            request_df.to_excel(writer, sheet_name="현장 간섭 및 요청사항 Request", index=False)
+            ws_request = writer.sheets["현장 간섭 및 요청사항 Request"]
+            # 각 컬럼 너비 조정
+            ws_request.set_column(0, 0, 10)  # EHS
+            ws_request.set_column(1, 1, 40)  # 현장간섭 및 요청사항
+            ws_request.set_column(2, 2, 25)  # 해당업체(부서)
+            ws_request.set_column(3, 3, 15)  # 완료유무
+
+        return output.getvalue()
+        
+    except ImportError:
+        warnings.warn("Excel 다운로드를 위한 라이브러리가 없습니다. CSV로 다운로드합니다.")
+        # CSV 백업도 동일한 형식으로 생성
+        from datetime import datetime
+        csv_buffer = io.StringIO()
+        
+        # 메인 결과를 CSV로 생성
+        main_result_df = build_main_result_df(results, datetime.now().strftime("%Y-%m-%d"))
+        
+        main_result_df.to_csv(csv_buffer, index=False, encoding="utf-8-sig")
+        return csv_buffer.getvalue().encode("utf-8-sig")
@@ -0,0 +1,92 @@
+# Response Cache (GPT 응답 캐시)
+# -----------------------------------------------------------------------------
+# Phase 1 / Phase 2 생성 결과를 요청 내용 기준으로 저장하여, 같은 작업활동을 같은
+# 데이터셋으로 다시 평가할 때 LLM 호출 없이 즉시 반환합니다.
+#  - Key  : (모델, System/User Prompt, temperature, top_p, max_tokens) 의 SHA-256
+#  - TTL  : ttl_seconds 가 지난 응답은 만료 (다시 생성)
+#  - 크기 : max_items 초과 시 가장 오래 사용하지 않은 응답부터 삭제
+# 번역은 TranslationMemory 가 담당하므로 이 캐시에는 저장하지 않습니다.
+# -----------------------------------------------------------------------------
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def response_key(request_params: dict) -> str:
+    """Chat Completion 요청 파라미터의 정규화 JSON → SHA-256 hex"""
+    raw = json.dumps(request_params, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite 기반 GPT 응답 캐시 (TTL + LRU 크기 제한, thread-safe)"""
+
+    def __init__(self, path: str = "response_cache.sqlite3", ttl_seconds: float = 7 * 24 * 3600,
+                 max_items: int = 10000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, response TEXT, created_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, request_params: dict) -> str | None:
+        """저장된 응답 반환. 없거나 만료되었으면 None"""
+        key = response_key(request_params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, request_params: dict, response: str) -> None:
+        """응답 저장 (빈 응답은 저장하지 않음). max_items 초과분은 오래 사용하지 않은 순으로 삭제"""
+        if not response:
+            return
+        key = response_key(request_params)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, request_params.get("model", ""), response, now, now),
+            )
+            excess = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_items
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)", (excess,)
+                )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """hit / miss / hit_rate / 저장된 응답 수"""
+        total = self.hits + self.misses
+        with self._lock:
+            items = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "items": items,
+        }
@@ -0,0 +1,737 @@
+# Risk Assessment Engine
+# -----------------------------------------------------------------------------
+# 위험성 평가 파이프라인입니다. Streamlit 에 의존하지 않으므로 Worker 프로세스, CLI
+# (batch_assessment.py), 벤치마크에서 그대로 import 하여 사용할 수 있습니다.
+#  0) 데이터셋 Load → 임베딩(EmbeddingStore) → FAISS 인덱스 구성 (build_retriever)
+#     여러 데이터셋을 함께 검색할 때는 데이터셋별 인덱스를 FederatedIndex 로 묶어 사용
+#  1) 유사사례 Retrieval (쿼리 임베딩 → FAISS 검색 → 최소 유사도 필터)
+#     Hybrid 모드는 문자 n-gram BM25(LexicalIndex) 결과와 RRF 로 결합하며, 임베딩이 실패하거나
+#     EMBED_QUERY_TIMEOUT 안에 끝나지 않으면 Lexical 검색만으로 진행
+#     쿼리 임베딩이 의미 캐시(SemanticCache)의 기존 작업활동과 충분히 유사하면 2) ~ 4) 생략
+#  2) Phase 1: 유해위험요인 예측 + 위험도(빈도, 강도, T) 평가
+#  3) Phase 2: 개선대책 및 개선 후 위험도 생성
+#  4) 결과 언어로 번역 (JSON 배치 번역 + 번역 메모리)
+# Excel Export 는 report.py 를 사용합니다.
+# 앱(stream.py)은 단계별 함수를 화면 출력과 함께 호출하고, 일괄 평가(batch_assessment.py)는
+# assess_activity 로 전체 단계를 한 번에 실행합니다.
+# 평가를 완료할 수 없으면 AssessmentError, GPT 호출 실패 시 LLMError 가 발생합니다.
+# -----------------------------------------------------------------------------
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable
+
+import faiss
+import numpy as np
+import pandas as pd
+
+from corpus_build import attach_corpus_translations, corpus_artifact_path, load_corpus_translations
+from dataset import build_retriever_pool, read_dataset
+from embedding_store import EmbeddingStore, content_ids
+from embeddings import EmbeddingProvider, get_embedding_provider
+from lexical_index import LexicalIndex, reciprocal_rank_fusion
+from llm import chat_completion
+from normalize import determine_grade
+from response_cache import ResponseCache
+from semantic_cache import SEMANTIC_CACHE_THRESHOLD, SemanticCache
+from translation import LANGUAGE_CODES, TRANSLATION_FIELDS, translate_batch, translate_to_english
+from translation_memory import TranslationMemory
+from vector_index import load_or_sync_index, normalize_vectors
+
+# 검색할 유사사례 수 / 유사사례로 사용할 최소 Cosine 유사도 기본값
+TOP_K = 10
+MIN_SIMILARITY = 0.3
+
+# Hybrid 검색 시 Lexical 검색으로 찾은 행의 최소 쿼리 n-gram 일치율 기본값
+MIN_LEXICAL_COVERAGE = 0.5
+
+# Hybrid 검색 시 쿼리 임베딩 대기 한도(초). 초과하거나 실패하면 Lexical 검색 결과만 사용
+EMBED_QUERY_TIMEOUT = 3.0
+
+
+class AssessmentError(RuntimeError):
+    """유사사례 없음, GPT 응답 파싱 실패 등으로 평가를 완료할 수 없는 경우"""
+
+
+def compute_rrr(original_t: int, improved_t: int) -> float:
+    """Risk Reduction Rate (RRR) = 위험도 감소율(%) 계산"""
+    if original_t == 0:
+        return 0.0
+    return ((original_t - improved_t) / original_t) * 100
+
+
+# -----------------------------------------------------------------------------
+# Load / Embed / Index
+# -----------------------------------------------------------------------------
+
+def load_dataset(dataset_file: str) -> pd.DataFrame:
+    """확장자 없는 데이터셋 파일명(예: 건축)으로 전처리된 DataFrame 반환"""
+    df = read_dataset(dataset_file)
+    if df is None:
+        raise FileNotFoundError(f"데이터셋 파일을 찾을 수 없습니다: {dataset_file}.xlsx 또는 {dataset_file}.xls")
+    return df
+
+
+def build_retriever(df: pd.DataFrame, dataset_path: str | None, embedding_provider: str, backend: str,
+                    api_key: str, progress_callback: Callable[[int, int], None] | None = None
+                    ) -> tuple[pd.DataFrame, faiss.Index, np.ndarray]:
+    """데이터셋 DataFrame 으로 (Pool DataFrame, FAISS Index, 정규화 임베딩) 구성
+
+    검색 점수는 L2 정규화 벡터의 내적(= Cosine 유사도)이고, 인덱스는 Pool 의 row_id(index) 를 반환합니다.
+    정규화 임베딩은 pool_df 행 순서를 따릅니다.
+    dataset_path 가 있으면 임베딩/학습된 인덱스를 파일 옆에 저장하여 재사용하며, 데이터셋에 행이
+    추가/수정/삭제되면 새 행만 임베딩하고 인덱스는 바뀐 row_id 만 추가/삭제합니다 (증분 동기화).
+    """
+    pool_df = build_retriever_pool(df)
+    to_embed = pool_df["content"].tolist()
+
+    # corpus_build.py 로 생성한 사전 번역 Artifact 가 있으면 번역 컬럼 추가 (Query 시 LLM 번역 생략)
+    if dataset_path and os.path.exists(corpus_artifact_path(dataset_path)):
+        pool_df = attach_corpus_translations(pool_df, load_corpus_translations(corpus_artifact_path(dataset_path)))
+
+    # 데이터셋 파일 옆 On-disk 저장소에 없는 행만 임베딩 (전체 Corpus, 동시 배치)
+    provider = get_embedding_provider(embedding_provider, api_key)
+    provider.warm_up()
+    embed_fn = lambda batch: provider.embed(batch, progress_callback=progress_callback)
+    # L2 정규화 벡터 + Inner Product = Cosine 유사도
+    # (저장소 벡터는 저장 시 정규화되므로 memory-map 을 복사 없이 그대로 사용)
+    index_cache = None
+    if dataset_path:
+        store = EmbeddingStore(dataset_path, provider.model)
+        vecs = store.get_or_embed(to_embed, embed_fn)
+        index_cache = store.index_path(f"{backend}.ip")
+    else:
+        vecs = normalize_vectors(np.array(embed_fn(to_embed), dtype="float32"))
+    index, _ = load_or_sync_index(vecs, pool_df.index.to_numpy(), backend, index_cache,
+                                  metric=faiss.METRIC_INNER_PRODUCT)
+    if not isinstance(vecs, np.memmap):
+        vecs.setflags(write=False)
+    return pool_df, index, vecs
+
+
+# shard 검색용 공유 스레드 풀 (FAISS search 는 GIL 을 해제하므로 shard 들이 실제로 병렬 실행됨)
+_SHARD_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="faiss-shard")
+
+
+def shard_salt(name: str) -> int:
+    """데이터셋(shard) 별 row_id 변환값. 통합 Pool 의 row_id = shard row_id XOR shard_salt(name)"""
+    return int(content_ids([f"shard:{name}"])[0])
+
+
+class FederatedIndex:
+    """데이터셋별 FAISS 인덱스(shard)를 병렬 검색하여 가중 점수 순으로 병합하는 검색기
+
+    faiss.Index 와 같은 search(q_vec, k) → (D, I) 를 제공하므로 federated_retriever 의 Pool 과 함께
+    search_similar_cases / assess_activity 에 그대로 넘길 수 있습니다. I 는 통합 Pool 의 row_id
+    (shard row_id XOR shard_salt), D 는 가중치 적용 전 Cosine 유사도이며, 각 행은
+    (유사도 × 데이터셋 가중치) 내림차순으로 정렬됩니다. 같은 content 가 여러 shard 에서 검색되면
+    가중 점수가 높은 shard 의 행 하나만 반환하므로 출처 dataset 은 실제로 검색된 shard 입니다.
+    shard 는 build_retriever 결과를 그대로 참조하므로 인덱스를 다시 만들지 않습니다.
+    """
+
+    def __init__(self, shards: dict[str, faiss.Index], weights: dict[str, float] | None = None):
+        weights = weights or {}
+        # 가중치 0 인 데이터셋은 검색하지 않음
+        self.shards = {name: index for name, index in shards.items() if weights.get(name, 1.0) > 0}
+        self.weights = {name: float(weights.get(name, 1.0)) for name in self.shards}
+        self.salts = {name: shard_salt(name) for name in self.shards}
+        self.ntotal = sum(index.ntotal for index in self.shards.values())
+        self.d = next(iter(self.shards.values())).d if self.shards else 0
+
+    def search(self, q_vec: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """shard 별 top-k 를 동시에 검색 후 병합 (같은 content 는 가중 점수가 높은 shard 의 행 유지)"""
+        futures = {
+            name: _SHARD_EXECUTOR.submit(index.search, q_vec, min(k, index.ntotal))
+            for name, index in self.shards.items() if index.ntotal
+        }
+        D = np.full((len(q_vec), k), -np.inf, dtype="float32")
+        I = np.full((len(q_vec), k), -1, dtype="int64")
+        for q in range(len(q_vec)):
+            # shard row_id → (가중 점수, 유사도, 통합 Pool row_id)
+            merged: dict[int, tuple[float, float, int]] = {}
+            for name, future in futures.items():
+                shard_D, shard_I = future.result()
+                for d, i in zip(shard_D[q], shard_I[q]):
+                    score = float(d) * self.weights[name]
+                    if i >= 0 and (i not in merged or score > merged[i][0]):
+                        merged[i] = (score, float(d), int(i) ^ self.salts[name])
+            top = sorted(merged.values(), key=lambda item: item[0], reverse=True)[:k]
+            for j, (_, d, row_id) in enumerate(top):
+                I[q, j], D[q, j] = row_id, d
+        return D, I
+
+
+class FederatedLexicalIndex:
+    """데이터셋별 LexicalIndex(shard)를 검색하여 가중 BM25 점수 순으로 병합하는 검색기
+
+    LexicalIndex 와 같은 search(query, k) → (row_id, 점수, 일치율) 를 제공하며, row_id 는
+    federated_retriever 통합 Pool 의 row_id, 점수는 (BM25 × 데이터셋 가중치) 입니다.
+    FederatedIndex 와 같은 규칙으로 가중치 0 인 데이터셋은 제외하고, 같은 content 는
+    가중 점수가 높은 shard 의 행 하나만 반환합니다.
+    """
+
+    def __init__(self, shards: dict[str, LexicalIndex], weights: dict[str, float] | None = None):
+        weights = weights or {}
+        self.shards = {name: index for name, index in shards.items() if weights.get(name, 1.0) > 0}
+        self.weights = {name: float(weights.get(name, 1.0)) for name in self.shards}
+        self.salts = {name: shard_salt(name) for name in self.shards}
+
+    def __len__(self) -> int:
+        return sum(len(index) for index in self.shards.values())
+
+    def search(self, query: str, k: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """shard 별 top-k 를 검색 후 가중 점수 내림차순으로 병합한 상위 k 개"""
+        # shard row_id → (가중 점수, 일치율, 통합 Pool row_id)
+        merged: dict[int, tuple[float, float, int]] = {}
+        for name, index in self.shards.items():
+            for row_id, score, coverage in zip(*index.search(query, k)):
+                score = float(score) * self.weights[name]
+                if row_id not in merged or score > merged[row_id][0]:
+                    merged[row_id] = (score, float(coverage), int(row_id) ^ self.salts[name])
+        top = sorted(merged.values(), key=lambda item: item[0], reverse=True)[:k]
+        return (np.array([row_id for *_, row_id in top], dtype="int64"),
+                np.array([score for score, *_ in top], dtype="float32"),
+                np.array([coverage for _, coverage, _ in top], dtype="float32"))
+
+
+def federated_retriever(retrievers: dict[str, tuple], weights: dict[str, float] | None = None
+                        ) -> tuple[pd.DataFrame, FederatedIndex]:
+    """데이터셋별 build_retriever 결과로 (통합 Pool DataFrame, FederatedIndex) 구성
+
+    가중치 0 인 데이터셋은 제외합니다. 통합 Pool 은 각 Pool 에 출처 dataset 컬럼을 추가하고
+    row_id 를 shard 별로 변환(shard_salt)하여 합친 것이므로, 같은 content 라도 데이터셋마다 별도 행입니다.
+    """
+    weights = weights or {}
+    retrievers = {name: r for name, r in retrievers.items() if weights.get(name, 1.0) > 0}
+    pool_df = pd.concat([
+        pool.assign(dataset=name).set_axis(pd.Index(pool.index.to_numpy() ^ shard_salt(name), name="row_id"))
+        for name, (pool, *_) in retrievers.items()
+    ])
+    index = FederatedIndex({name: index for name, (_, index, *_) in retrievers.items()}, weights)
+    return pool_df, index
+
+
+# -----------------------------------------------------------------------------
+# Retrieval & 번역
+# -----------------------------------------------------------------------------
+
+def embed_query(provider: EmbeddingProvider, activity: str, activity_en: str,
+                timeout: float | None = None) -> np.ndarray:
+    """작업활동 쿼리의 정규화 임베딩 (1, dim)
+
+    다국어 Provider 는 원문(한국어 등) 쿼리를, 그 외에는 영어 번역 쿼리를 임베딩합니다.
+    timeout 을 지정하면 재시도 없이 약 timeout 초 안에 끝나는 요청으로 임베딩합니다.
+    """
+    query_text = activity if provider.multilingual_query else activity_en
+    q_emb_list = provider.embed_query(query_text, timeout=timeout)
+    if not q_emb_list:
+        raise AssessmentError("작업활동 임베딩을 생성할 수 없습니다.")
+    return normalize_vectors(np.array(q_emb_list[:1], dtype="float32"))
+
+
+# 쿼리 임베딩용 스레드 풀 (embed_query_or_none 의 대기 한도 적용)
+_QUERY_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="query-embed")
+
+
+def embed_query_or_none(provider: EmbeddingProvider, activity: str, activity_en: str,
+                        timeout: float = EMBED_QUERY_TIMEOUT) -> np.ndarray | None:
+    """embed_query 결과를 timeout 초까지 기다려 반환. 실패하거나 시간이 초과되면 None
+
+    요청 자체도 HTTP 대기 한도가 timeout 인 1회 요청이므로, 시간이 초과되어도 스레드를 오래 점유하지 않습니다.
+    아직 시작되지 않은(스레드 풀 대기 중) 요청은 취소합니다.
+    """
+    future = _QUERY_EXECUTOR.submit(embed_query, provider, activity, activity_en, timeout)
+    try:
+        return future.result(timeout=timeout)
+    except Exception:
+        future.cancel()
+        return None
+
+
+def _lexical_hits(lexical: LexicalIndex, queries: tuple[str, ...], top_k: int,
+                  min_coverage: float) -> dict[int, float]:
+    """원문 / 영어 쿼리의 Lexical 검색 결과를 행별 최고 BM25 점수로 합쳐 {row_id: n-gram 일치율} (점수 순)"""
+    best: dict[int, tuple[float, float]] = {}
+    for query in dict.fromkeys(q for q in queries if q):
+        for row_id, score, coverage in zip(*lexical.search(query, top_k)):
+            row_id = int(row_id)
+            if coverage >= min_coverage and score > best.get(row_id, (0.0, 0.0))[0]:
+                best[row_id] = (float(score), float(coverage))
+    ranked = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:top_k]
+    return {row_id: coverage for row_id, (_, coverage) in ranked}
+
+
+def search_similar_cases(pool_df: pd.DataFrame, index: faiss.Index, provider: EmbeddingProvider,
+                         activity: str, activity_en: str, min_similarity: float = MIN_SIMILARITY,
+                         top_k: int = TOP_K, q_vec: np.ndarray | None = None,
+                         lexical: LexicalIndex | None = None,
+                         min_coverage: float = MIN_LEXICAL_COVERAGE) -> pd.DataFrame:
+    """상위 top_k 개 중 min_similarity 이상인 Pool 행을 유사도 내림차순으로 반환 (similarity 컬럼 추가)
+
+    q_vec(embed_query 결과)을 넘기면 쿼리를 다시 임베딩하지 않습니다.
+    lexical 을 넘기면 (Hybrid) 벡터 검색 순위와 원문 / 영어 작업활동의 Lexical 검색 순위(쿼리 n-gram
+    일치율 min_coverage 이상)를 RRF 로 결합한 순서로 반환하며, q_vec 이 None 이면 임베딩 없이
+    Lexical 검색 결과만 사용합니다. 이때 coverage 컬럼(n-gram 일치율)이 추가되고,
+    Lexical 검색으로만 찾은 행의 similarity 는 NaN 입니다.
+    """
+    if q_vec is None and lexical is None:
+        q_vec = embed_query(provider, activity, activity_en)
+    # 최소 유사도 미만의 약한 매칭은 프롬프트/번역 대상에서 제외
+    vector_hits = {}
+    if q_vec is not None:
+        D, I = index.search(q_vec, k=min(top_k, len(pool_df)))
+        vector_hits = {int(i): float(d) for i, d in zip(I[0], D[0]) if i >= 0 and d >= min_similarity}
+    lexical_hits = {}
+    if lexical is not None:
+        lexical_hits = _lexical_hits(lexical, (activity, activity_en), top_k, min_coverage)
+    if not vector_hits and not lexical_hits:
+        raise AssessmentError("유사한 사례를 찾을 수 없습니다.")
+
+    hit_ids = list(vector_hits)
+    if lexical is not None:
+        hit_ids = [row_id for row_id, _ in reciprocal_rank_fusion([hit_ids, list(lexical_hits)])][:top_k]
+    # 인덱스는 위치가 아닌 row_id 를 반환하므로 Pool 의 row_id index 로 조회
+    sim_docs = pool_df.loc[hit_ids].copy()
+    sim_docs["similarity"] = [vector_hits.get(i, np.nan) for i in hit_ids]
+    if lexical is not None:
+        sim_docs["coverage"] = [lexical_hits.get(i, np.nan) for i in hit_ids]
+    return sim_docs
+
+
+def pretranslated(row: pd.Series, field: str, language: str) -> str | None:
+    """Corpus Artifact 에서 미리 번역된 값 조회 (없으면 None)"""
+    value = row.get(f"{field}_{LANGUAGE_CODES[language]}")
+    return value if isinstance(value, str) and value else None
+
+
+def translate_similar_cases(sim_docs: pd.DataFrame, api_key: str, tm: TranslationMemory) -> pd.DataFrame:
+    """유사사례 DataFrame 의 주요 컬럼을 영어로 번역하여 반환 (사전 번역 Artifact → 번역 메모리 → JSON 배치 번역)"""
+    sim_docs_en = sim_docs.copy().reset_index(drop=True)
+    rows = [
+        {field: str(row[src_col]) for field, (src_col, _) in TRANSLATION_FIELDS.items()
+         if not pretranslated(row, field, "English")}
+        for _, row in sim_docs_en.iterrows()
+    ]
+    translated = translate_batch(rows, "Korean", "English", api_key, tm)
+    for field in TRANSLATION_FIELDS:
+        sim_docs_en[f"{field}_en"] = [
+            tr.get(field) or pretranslated(row, field, "English")
+            for tr, (_, row) in zip(translated, sim_docs_en.iterrows())
+        ]
+    return sim_docs_en
+
+
+def translate_outputs(contents: list[str], target_language: str, api_key: str,
+                      tm: TranslationMemory) -> dict[str, str]:
+    """영어 결과 문자열들을 target_language 로 배치 번역하여 {원문: 번역} 반환 (실패 시 원문)"""
+    unique = list(dict.fromkeys(c for c in contents if c))
+    translated = translate_batch([{"text": c} for c in unique], "English", target_language, api_key, tm)
+    return {c: tr["text"] or c for c, tr in zip(unique, translated)}
+
+
+def localize_activity(activity_en: str, result_language: str, api_key: str, tm: TranslationMemory) -> str:
+    """영어 작업활동을 result_language 로 번역 (의미 캐시 결과에 현재 작업활동을 표시할 때 사용)"""
+    return translate_outputs([activity_en], result_language, api_key, tm).get(activity_en, activity_en)
+
+
+def localize_results(activity_en: str, hazard_en: str, improvement_plan_en: str,
+                     sim_docs_en: pd.DataFrame, result_language: str, api_key: str,
+                     tm: TranslationMemory) -> tuple[str, str, str, list[dict]]:
+    """영어 결과와 유사사례를 result_language 로 번역
+
+    (작업활동, 유해위험요인, 개선대책, 유사사례 표시용 레코드) 를 반환합니다.
+    서로 독립적인 번역은 하나의 JSON 배치로 묶고, 사전 번역된 유사사례 필드는 번역하지 않습니다.
+    """
+    pending_outputs = [hazard_en, improvement_plan_en, activity_en]
+    if result_language != "English":
+        pending_outputs += [
+            row[f"{field}_en"]
+            for _, row in sim_docs_en.iterrows()
+            for field in ("activity", "hazard", "plan")
+            if not pretranslated(row, field, result_language)
+        ]
+    translated = translate_outputs(pending_outputs, result_language, api_key, tm)
+
+    def display_text(row: pd.Series, field: str) -> str:
+        """사전 번역 Artifact 우선, 없으면 배치 번역 결과 (English 는 영어 원문)"""
+        eng = row[f"{field}_en"]
+        return pretranslated(row, field, result_language) or translated.get(eng, eng)
+
+    similar_records = [
+        {
+            "작업활동": display_text(row, "activity"),
+            "유해위험요인": display_text(row, "hazard"),
+            "빈도": row["빈도"],
+            "강도": row["강도"],
+            "T": row["T"],
+            # 데이터셋 캐시의 등급은 언어 무관(한국어)이므로 결과 언어로 다시 계산 ("Unknown" 등)
+            "등급": determine_grade(row["T"], result_language),
+            "개선대책": display_text(row, "plan"),
+            # Lexical 검색으로만 찾은 사례는 유사도 없음 (None), Hybrid 검색 결과는 n-gram 일치율 표시
+            "유사도": None if pd.isna(row["similarity"]) else round(row["similarity"], 4),
+            **({"일치율": None if pd.isna(row["coverage"]) else round(row["coverage"], 4)}
+               if "coverage" in row else {}),
+            # 연합 검색 결과는 출처 데이터셋 표시
+            **({"데이터셋": row["dataset"]} if "dataset" in row else {}),
+        }
+        for _, row in sim_docs_en.iterrows()
+    ]
+    return (
+        translated.get(activity_en, activity_en),
+        translated.get(hazard_en, hazard_en),
+        translated.get(improvement_plan_en, improvement_plan_en),
+        similar_records,
+    )
+
+
+# -----------------------------------------------------------------------------
+# Prompt & Parsing
+# -----------------------------------------------------------------------------
+
+def construct_prompt_phase1_hazard(sim_docs_en: pd.DataFrame, activity_en: str) -> str:
+    """Phase1 risk 예측을 위한 GPT 프롬프트 생성"""
+    intro = "Below are examples of work activities and associated hazards at construction sites:\n\n"
+    example_fmt = "Example {i}:\n- Work Activity: {act}\n- Hazard: {haz}\n\n"
+    query_fmt = (
+        "Based on the above examples, predict the main hazards for the following work activity:\n\n"
+        f"Work Activity: {activity_en}\n\nPredicted Hazard: "
+    )
+    prompt = intro
+    for i, (_, row) in enumerate(sim_docs_en.head(10).iterrows(), start=1):
+        act = row["activity_en"]
+        haz = row["hazard_en"]
+        if pd.notna(act) and pd.notna(haz):
+            prompt += example_fmt.format(i=i, act=act, haz=haz)
+    prompt += query_fmt
+    return prompt
+
+
+def construct_prompt_phase1_risk(sim_docs_en: pd.DataFrame, activity_en: str, hazard_en: str) -> str:
+    """Phase1 Risk(Freq,Intensity,T) 평가 프롬프트 생성"""
+    intro = (
+        "Construction site risk assessment criteria:\n"
+        "- Frequency(1-5): 1=Very Rare, 2=Rare, 3=Occasional, 4=Frequent, 5=Very Frequent\n"
+        "- Intensity(1-5): 1=Minor Injury, 2=Light Injury, 3=Moderate Injury, 4=Serious Injury, 5=Fatality\n"
+        "- T-value = Frequency × Intensity\n\n"
+        "Reference Cases:\n\n"
+    )
+    example_fmt = "Case {i}:\nInput: {inp}\nAssessment: Frequency={freq}, Intensity={intensity}, T-value={t}\n\n"
+    json_format = '{"frequency": number, "intensity": number, "T": number}'
+    query_fmt = (
+        "Based on the above criteria and cases, assess the following:\n\n"
+        f"Work Activity: {activity_en}\n"
+        f"Hazard: {hazard_en}\n\n"
+        f"Respond exactly in this JSON format:\n{json_format}"
+    )
+    prompt = intro
+    count = 0
+    for _, row in sim_docs_en.head(10).iterrows():
+        try:
+            inp = f"{row['activity_en']} - {row['hazard_en']}"
+            freq = int(row["빈도"])
+            intensity = int(row["강도"])
+            t_val = freq * intensity
+            count += 1
+            prompt += example_fmt.format(i=count, inp=inp, freq=freq, intensity=intensity, t=t_val)
+            if count >= 3:
+                break
+        except Exception:
+            continue
+    prompt += query_fmt
+    return prompt
+
+
+def parse_gpt_output_phase1(gpt_output: str) -> tuple[int, int, int]:
+    """GPT 출력(JSON 형태) 파싱 → (Frequency, Intensity, T) 반환"""
+    pattern = r'\{"frequency":\s*([1-5]),\s*"intensity":\s*([1-5]),\s*"T":\s*([0-9]+)\}'
+    match = re.search(pattern, gpt_output)
+    if match:
+        freq = int(match.group(1))
+        intensity = int(match.group(2))
+        t_val = int(match.group(3))
+        return freq, intensity, t_val
+    nums = re.findall(r'\b([1-5])\b', gpt_output)
+    if len(nums) >= 2:
+        freq = int(nums[0])
+        intensity = int(nums[1])
+        return freq, intensity, freq * intensity
+    return None
+
+
+def construct_prompt_phase2(sim_docs_en: pd.DataFrame, activity_en: str, hazard_en: str,
+                             freq: int, intensity: int, t_val: int, api_key: str) -> str:
+    """Phase2 개선대책 생성 프롬프트 구성"""
+                                 
+    example_section = ""
+    count = 0
+    for _, row in sim_docs_en.head(10).iterrows():
+        try:
+            plan_en = row["plan_en"]
+            orig_freq = int(row["빈도"])
+            orig_intensity = int(row["강도"])
+            orig_t = orig_freq * orig_intensity
+            new_freq = max(1, orig_freq - 1)
+            new_intensity = max(1, orig_intensity - 1)
+            new_t = new_freq * new_intensity
+
+            count += 1
+            example_section += (
+                f"Example {count}:\n"
+                f"Input Work Activity: {row['activity_en']}\n"
+                f"Input Hazard: {row['hazard_en']}\n"
+                f"Original Frequency: {orig_freq}\n"
+                f"Original Intensity: {orig_intensity}\n"
+                f"Original T-value: {orig_t}\n"
+                "Output (Improvement Plan and Risk Reduction) in JSON:\n"
+                "{\n"
+                f'  "improvement_plan": "{plan_en}",\n'
+                f'  "improved_frequency": {new_freq},\n'
+                f'  "improved_intensity": {new_intensity},\n'
+                f'  "improved_T": {new_t},\n'
+                f'  "reduction_rate": {compute_rrr(orig_t, new_t):.2f}\n'
+                "}\n\n"
+            )
+            if count >= 2:
+                break
+        except Exception:
+            continue
+
+    if count == 0:
+        example_section = (
+            "Example 1:\n"
+            "Input Work Activity: Excavation and backfilling\n"
+            "Input Hazard: Collapse of excavation wall\n"
+            "Original Frequency: 3\n"
+            "Original Intensity: 4\n"
+            "Original T-value: 12\n"
+            "Output (Improvement Plan and Risk Reduction) in JSON:\n"
+            "{\n"
+            '  "improvement_plan": "1) Maintain proper slope according to soil classification\\n'
+            '2) Reinforce excavation walls\\n3) Conduct regular ground condition inspections",\n'
+            '  "improved_frequency": 1,\n'
+            '  "improved_intensity": 2,\n'
+            '  "improved_T": 2,\n'
+            '  "reduction_rate": 83.33\n'
+            "}\n\n"
+        )
+
+    prompt = (
+        example_section +
+        "Now here is a new input:\n"
+        f"Work Activity: {activity_en}\n"
+        f"Hazard: {hazard_en}\n"
+        f"Original Frequency: {freq}\n"
+        f"Original Intensity: {intensity}\n"
+        f"Original T-value: {t_val}\n\n"
+        "Please provide practical and specific improvement measures in the following JSON format:\n"
+        "{\n"
+        '  "improvement_plan": "numbered list of specific measures",\n'
+        '  "improved_frequency": (integer 1-5),\n'
+        '  "improved_intensity": (integer 1-5),\n'
+        '  "improved_T": (improved_frequency × improved_intensity),\n'
+        '  "reduction_rate": (percentage)\n'
+        "}\n\n"
+        "Improvement measures should include at least 3 field-applicable methods."
+    )
+    return prompt
+
+
+def parse_gpt_output_phase2(gpt_output: str) -> dict:
+    """GPT 개선대책 JSON 파싱 → dict"""
+    try:
+        json_match = re.search(r'\{.*\}', gpt_output, re.DOTALL)
+        if not json_match:
+            raise ValueError("JSON match not found")
+        import json
+        json_str = json_match.group(0)
+        parsed = json.loads(json_str)
+        if "improvement_plan" in parsed:
+            return {
+                "improvement_plan": parsed.get("improvement_plan", ""),
+                "improved_freq": parsed.get("improved_frequency", 1),
+                "improved_intensity": parsed.get("improved_intensity", 1),
+                "improved_T": parsed.get("improved_T", parsed.get("improved_frequency", 1) * parsed.get("improved_intensity", 1)),
+                "reduction_rate": parsed.get("reduction_rate", 0.0)
+            }
+        chinese_keys = {
+            "improvement": ["改进措施", "改进计划"],
+            "improved_freq": ["改进后频率", "新频率"],
+            "improved_intensity": ["改进后强度", "新强度"],
+            "improved_T": ["改进后T值", "新T值"],
+            "reduction_rate": ["T值降低率", "降低率"]
+        }
+        if any(key in parsed for key in chinese_keys["improvement"]):
+            im_plan = ""
+            for k in chinese_keys["improvement"]:
+                if k in parsed:
+                    im_plan = parsed[k]
+                    break
+            imp_freq = 1
+            for k in chinese_keys["improved_freq"]:
+                if k in parsed:
+                    imp_freq = int(parsed[k])
+                    break
+            imp_int = 1
+            for k in chinese_keys["improved_intensity"]:
+                if k in parsed:
+                    imp_int = int(parsed[k])
+                    break
+            imp_t = imp_freq * imp_int
+            for k in chinese_keys["improved_T"]:
+                if k in parsed:
+                    imp_t = int(parsed[k])
+                    break
+            r_rate = 0.0
+            for k in chinese_keys["reduction_rate"]:
+                if k in parsed:
+                    try:
+                        r_rate = float(parsed[k])
+                    except:
+                        r_rate = 0.0
+                    break
+            return {
+                "improvement_plan": im_plan,
+                "improved_freq": imp_freq,
+                "improved_intensity": imp_int,
+                "improved_T": imp_t,
+                "reduction_rate": r_rate
+            }
+        raise ValueError("No recognized keys found in JSON")
+    except Exception:
+        plan = ""
+        m_plan_en = re.search(r'"improvement_plan"\s*:\s*"(?P<plan>.*?)"', gpt_output, re.DOTALL)
+        if m_plan_en:
+            raw = m_plan_en.group("plan")
+            plan = raw.replace('\n', '\\n').strip()
+        else:
+            m_plan_cn = re.search(r'"(改进措施|改进计划)"\s*:\s*"(?P<plan>.*?)"', gpt_output, re.DOTALL)
+            if m_plan_cn:
+                raw = m_plan_cn.group("plan")
+                plan = raw.replace('\n', '\\n').strip()
+            else:
+                plan = (
+                    "1) Educate workers and mandate PPE usage\n"
+                    "2) Install pedestrian walkways\n"
+                    "3) Provide high-visibility vests"
+                )
+        def extract_int(keys: list[str]) -> int:
+            for key in keys:
+                m = re.search(rf'"{key}"\s*:\s*(\d+)', gpt_output)
+                if m:
+                    return int(m.group(1))
+            return 1
+        def extract_float(keys: list[str]) -> float:
+            for key in keys:
+                m = re.search(rf'"{key}"\s*:\s*([\d\.]+)', gpt_output)
+                if m:
+                    try:
+                        return float(m.group(1))
+                    except:
+                        return 0.0
+            return 0.0
+        english_keys = {
+            "improved_freq": ["improved_frequency"],
+            "improved_intensity": ["improved_intensity"],
+            "improved_T": ["improved_T"],
+            "reduction_rate": ["reduction_rate"]
+        }
+        chinese_keys = {
+            "improved_freq": ["改进后频率", "新频率"],
+            "improved_intensity": ["改进后强度", "新强度"],
+            "improved_T": ["改进后T值", "新T值"],
+            "reduction_rate": ["T值降低率", "降低率"]
+        }
+        imp_freq = extract_int(english_keys["improved_freq"] + chinese_keys["improved_freq"])
+        imp_int = extract_int(english_keys["improved_intensity"] + chinese_keys["improved_intensity"])
+        imp_t   = extract_int(english_keys["improved_T"] + chinese_keys["improved_T"])
+        r_rate  = extract_float(english_keys["reduction_rate"] + chinese_keys["reduction_rate"])
+        return {
+            "improvement_plan": plan,
+            "improved_freq": imp_freq,
+            "improved_intensity": imp_int,
+            "improved_T": imp_t,
+            "reduction_rate": r_rate
+        }
+
+
+# -----------------------------------------------------------------------------
+# 전체 파이프라인
+# -----------------------------------------------------------------------------
+
+def assess_activity(activity: str, api_key: str, pool_df: pd.DataFrame, index: faiss.Index,
+                    provider: EmbeddingProvider, tm: TranslationMemory, result_language: str = "Korean",
+                    min_similarity: float = MIN_SIMILARITY, cache: ResponseCache | None = None,
+                    semantic_cache: SemanticCache | None = None, cache_scope: str = "",
+                    semantic_threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                    lexical: LexicalIndex | None = None) -> dict:
+    """작업활동 1건의 Phase 1 + Phase 2 평가 결과 dict 반환 (앱의 ss.last_assessment 와 동일한 Key)
+
+    cache 를 넘기면 Phase 1 / Phase 2 GPT 응답을 재사용합니다 (None 이면 항상 새로 생성).
+    semantic_cache 의 같은 cache_scope 에 semantic_threshold 이상 유사한 작업활동이 있으면
+    평가 없이 그 결과를 반환합니다. 이때 "activity" 는 이번 작업활동이고, 결과를 만든 원래 작업활동과
+    유사도는 "cached_from" 에 담깁니다.
+    lexical 을 넘기면 Hybrid 검색을 사용하고, 쿼리 임베딩이 실패하거나 EMBED_QUERY_TIMEOUT 을
+    넘기면 의미 캐시 없이 Lexical 검색 결과만으로 평가합니다.
+    """
+    generate = partial(chat_completion, api_key=api_key, cache=cache)
+    activity_en = translate_to_english(activity, "activity", api_key, tm, source_lang="auto")
+    if lexical is None:
+        q_vec = embed_query(provider, activity, activity_en)
+    else:
+        q_vec = embed_query_or_none(provider, activity, activity_en)
+    if semantic_cache is not None and q_vec is not None:
+        cached = semantic_cache.lookup(cache_scope, q_vec, semantic_threshold)
+        if cached is not None:
+            result, cached_activity, similarity = cached
+            return {
+                **result,
+                "activity": localize_activity(activity_en, result_language, api_key, tm),
+                "cached_from": {"activity": cached_activity, "similarity": similarity},
+            }
+
+    sim_docs = search_similar_cases(pool_df, index, provider, activity, activity_en, min_similarity,
+                                    q_vec=q_vec, lexical=lexical)
+    sim_docs_en = translate_similar_cases(sim_docs, api_key, tm)
+
+    # ===== Phase 1 =====
+    hazard_en = generate(construct_prompt_phase1_hazard(sim_docs_en, activity_en))
+    if not hazard_en:
+        raise AssessmentError("유해위험요인을 예측할 수 없습니다.")
+    risk_json_en = generate(construct_prompt_phase1_risk(sim_docs_en, activity_en, hazard_en))
+    parse_result = parse_gpt_output_phase1(risk_json_en)
+    if not parse_result:
+        raise AssessmentError("위험성 평가를 파싱할 수 없습니다.")
+    freq, intensity, T_val = parse_result
+
+    # ===== Phase 2 =====
+    improvement_json_en = generate(
+        construct_prompt_phase2(sim_docs_en, activity_en, hazard_en, freq, intensity, T_val, api_key)
+    )
+    parsed_improvement = parse_gpt_output_phase2(improvement_json_en)
+    improvement_plan_en = parsed_improvement.get("improvement_plan", "")
+    improved_freq = parsed_improvement.get("improved_freq", 1)
+    improved_intensity = parsed_improvement.get("improved_intensity", 1)
+    improved_T = parsed_improvement.get("improved_T", improved_freq * improved_intensity)
+
+    activity_user, hazard_user, improvement_user, similar_records = localize_results(
+        activity_en, hazard_en, improvement_plan_en, sim_docs_en, result_language, api_key, tm
+    )
+    result = {
+        "activity": activity_user,
+        "hazard": hazard_user,
+        "freq": freq,
+        "intensity": intensity,
+        "T": T_val,
+        "grade": determine_grade(T_val, result_language),
+        "improvement_plan": improvement_user,
+        "improved_freq": improved_freq,
+        "improved_intensity": improved_intensity,
+        "improved_T": improved_T,
+        "rrr": compute_rrr(T_val, improved_T),
+        "similar_cases": similar_records,
+    }
+    if semantic_cache is not None and q_vec is not None:
+        semantic_cache.put(cache_scope, activity, q_vec, result)
+    return result
@@ -0,0 +1,144 @@
+# Semantic Cache (유사 작업활동 평가 결과 캐시)
+# -----------------------------------------------------------------------------
+# 평가가 끝난 작업활동의 쿼리 임베딩과 평가 결과(ss.last_assessment 와 같은 dict)를
+# 함께 저장하고, 새 작업활동의 임베딩이 기존 항목과 threshold 이상으로 유사하면
+# Retrieval / Phase 1 / Phase 2 / 결과 번역 없이 저장된 결과를 반환합니다.
+#   예) "철골 하역 작업" ↔ "철골 구조재 하역"
+#  - 영구 저장소: SQLite (벡터는 float32 bytes)
+#  - 검색: scope 별 FAISS IndexIDMap(IndexFlatIP), 정규화 벡터의 내적 = Cosine 유사도
+#  - scope: 데이터셋 / 임베딩 Provider / 결과 언어 / 최소 유사도 / 모델 등 결과가 달라지는 설정
+#  - TTL 만료 항목은 조회 시 삭제, max_items 초과 시 가장 오래 사용하지 않은 항목부터 삭제
+# -----------------------------------------------------------------------------
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any
+
+import faiss
+import numpy as np
+
+# 이 값 이상의 Cosine 유사도면 같은 작업활동으로 보고 저장된 결과를 재사용
+SEMANTIC_CACHE_THRESHOLD = 0.95
+
+
+def semantic_scope(*settings: Any) -> str:
+    """평가 결과에 영향을 주는 설정값 묶음 → scope 문자열 (SHA-256 hex 앞 16자)"""
+    return hashlib.sha256(repr(settings).encode("utf-8")).hexdigest()[:16]
+
+
+def json_default(obj: Any) -> Any:
+    """numpy 스칼라 등 JSON 기본 타입이 아닌 값 변환"""
+    return obj.item() if hasattr(obj, "item") else str(obj)
+
+
+class SemanticCache:
+    """SQLite 영구 저장 + scope 별 FAISS 인덱스 의미 캐시 (TTL + LRU 크기 제한, thread-safe)"""
+
+    def __init__(self, path: str = "semantic_cache.sqlite3", ttl_seconds: float = 7 * 24 * 3600,
+                 max_items: int = 5000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._indexes: dict[str, faiss.IndexIDMap] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, scope TEXT, activity TEXT, vector BLOB,"
+            " result TEXT, created_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_scope ON entries (scope)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self._conn.commit()
+
+    def _index(self, scope: str, dim: int) -> faiss.IndexIDMap:
+        """scope 의 인덱스 반환. 처음 사용할 때 SQLite 의 해당 scope 항목으로 구성"""
+        index = self._indexes.get(scope)
+        if index is not None and index.d == dim:
+            return index
+        index = faiss.IndexIDMap(faiss.IndexFlatIP(dim))
+        rows = self._conn.execute("SELECT id, vector FROM entries WHERE scope = ?", (scope,)).fetchall()
+        rows = [(i, v) for i, v in rows if len(v) == dim * 4]
+        if rows:
+            ids = np.array([i for i, _ in rows], dtype="int64")
+            vecs = np.stack([np.frombuffer(v, dtype="float32") for _, v in rows])
+            index.add_with_ids(vecs, ids)
+        self._indexes[scope] = index
+        return index
+
+    def _delete(self, ids: list[int]) -> None:
+        """SQLite 와 모든 scope 인덱스에서 항목 삭제 (lock 보유 상태에서 호출)"""
+        if not ids:
+            return
+        self._conn.executemany("DELETE FROM entries WHERE id = ?", [(i,) for i in ids])
+        id_array = np.array(ids, dtype="int64")
+        for index in self._indexes.values():
+            index.remove_ids(id_array)
+
+    def lookup(self, scope: str, q_vec: np.ndarray,
+               threshold: float = SEMANTIC_CACHE_THRESHOLD) -> tuple[dict, str, float] | None:
+        """정규화된 쿼리 벡터와 가장 유사한 항목이 threshold 이상이면 (결과, 저장된 작업활동, 유사도)"""
+        q_vec = np.ascontiguousarray(q_vec, dtype="float32").reshape(1, -1)
+        now = time.time()
+        with self._lock:
+            index = self._index(scope, q_vec.shape[1])
+            if index.ntotal == 0:
+                self.misses += 1
+                return None
+            D, I = index.search(q_vec, 1)
+            entry_id, similarity = int(I[0][0]), float(D[0][0])
+            row = None
+            if entry_id >= 0 and similarity >= threshold:
+                row = self._conn.execute(
+                    "SELECT activity, result, created_at FROM entries WHERE id = ?", (entry_id,)
+                ).fetchone()
+            if row is not None and now - row[2] > self.ttl_seconds:
+                self._delete([entry_id])
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE id = ?", (now, entry_id))
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[1]), row[0], similarity
+
+    def put(self, scope: str, activity: str, q_vec: np.ndarray, result: dict) -> None:
+        """평가 결과 저장. max_items 초과분은 오래 사용하지 않은 순으로 삭제"""
+        q_vec = np.ascontiguousarray(q_vec, dtype="float32").reshape(1, -1)
+        payload = json.dumps(result, ensure_ascii=False, default=json_default)
+        now = time.time()
+        with self._lock:
+            index = self._index(scope, q_vec.shape[1])
+            cursor = self._conn.execute(
+                "INSERT INTO entries (scope, activity, vector, result, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (scope, activity, q_vec.tobytes(), payload, now, now),
+            )
+            index.add_with_ids(q_vec, np.array([cursor.lastrowid], dtype="int64"))
+            excess = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_items
+            if excess > 0:
+                stale = self._conn.execute(
+                    "SELECT id FROM entries ORDER BY accessed_at LIMIT ?", (excess,)
+                ).fetchall()
+                self._delete([i for (i,) in stale])
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """hit / miss / hit_rate / 저장된 항목 수"""
+        total = self.hits + self.misses
+        with self._lock:
+            items = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "items": items,
+        }
@@ -0,0 +1,227 @@
+# Risk Assessment HTTP Service
+# -----------------------------------------------------------------------------
+# 작업허가(PTW) 시스템 등 외부 시스템에서 호출하는 비동기 위험성 평가 API 입니다.
+# 앱의 [위험성 평가 실행] 과 같은 단계(risk_engine.assess_activity)를 실행합니다.
+#  - 데이터셋별 Pool / FAISS 인덱스를 기동 시 1회 구성하여 메모리에 유지
+#  - 동일한 (데이터셋, 결과 언어, 최소 유사도, 작업활동) 요청이 처리 중이면 결과를 공유 (Coalescing)
+#  - 유사한 작업활동을 이미 평가했으면 의미 캐시의 결과를 반환 (응답의 "cached_from" 에 원래 작업활동 표시)
+#  - 동시 평가 수 제한 + 대기 한도 초과 시 503 (Backpressure), 요청별 Timeout 시 504
+#  - --hybrid 지정 시 문자 n-gram BM25 검색을 함께 사용하고, 임베딩 장애 시 Lexical 검색만으로 응답
+#  - GPT / 임베딩 호출은 llm 의 공유 Client(연결 풀) / RateLimiter 를 사용, 지연 시간은 /health 에 표시
+# 사용 예)
+#   python service.py --datasets 건축 토목 플랜트 --port 8000
+#   curl -X POST localhost:8000/assess -d '{"activity": "철골 하역 작업", "dataset": "건축"}'
+# OPENAI_BASE_URL 을 지정하면 로컬 Mock LLM / 임베딩 서버로 End-to-End 테스트할 수 있습니다.
+# -----------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from dataset import dataset_file_signature, resolve_dataset_path
+from embeddings import EMBEDDING_PROVIDERS, get_embedding_provider
+from lexical_index import LexicalIndex
+from llm import GPT_MODEL, LLMError, metrics
+from response_cache import ResponseCache
+from risk_engine import MIN_SIMILARITY, AssessmentError, assess_activity, build_retriever, load_dataset
+from semantic_cache import SEMANTIC_CACHE_THRESHOLD, SemanticCache, json_default, semantic_scope
+from translation import LANGUAGE_CODES
+from translation_memory import TranslationMemory
+from vector_index import INDEX_BACKENDS
+
+# 동시에 실행할 평가 수 / 처리 중 + 대기 중인 (Coalescing 후) 평가 최대 수 / 요청당 Timeout(초)
+SERVICE_MAX_CONCURRENCY = 8
+SERVICE_MAX_PENDING = 64
+SERVICE_REQUEST_TIMEOUT = 120.0
+
+
+class ServiceBusy(RuntimeError):
+    """대기 중인 평가가 한도를 넘어 새 요청을 받을 수 없는 경우"""
+
+
+class AssessmentService:
+    """데이터셋별 인덱스를 보유하고 평가 요청을 Coalescing / 동시성 제한하여 처리"""
+
+    def __init__(self, retrievers: dict[str, tuple], api_key: str, embedding_provider: str,
+                 tm: TranslationMemory, cache: ResponseCache | None = None,
+                 semantic_cache: SemanticCache | None = None,
+                 semantic_threshold: float = SEMANTIC_CACHE_THRESHOLD, hybrid: bool = False,
+                 retriever_keys: dict[str, tuple] | None = None,
+                 max_concurrency: int = SERVICE_MAX_CONCURRENCY, max_pending: int = SERVICE_MAX_PENDING,
+                 timeout: float = SERVICE_REQUEST_TIMEOUT):
+        self.retrievers = retrievers
+        self.api_key = api_key
+        self.provider = get_embedding_provider(embedding_provider, api_key)
+        self.tm = tm
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        self.semantic_threshold = semantic_threshold
+        # 의미 캐시 scope 용 데이터셋별 Key (데이터셋, 파일 시그니처, Provider, 인덱스 종류[, "hybrid"])
+        # 앱 / batch_assessment.py 와 같은 Key 이므로 데이터셋 파일이나 backend 가 바뀌면 이전 결과를 쓰지 않음
+        retriever_keys = retriever_keys or {name: (name, None, embedding_provider, None) for name in retrievers}
+        self.retriever_keys = {
+            name: retriever_keys[name] + (("hybrid",) if hybrid else ()) for name in retrievers
+        }
+        # 데이터셋별 Lexical 인덱스 (Hybrid 검색 사용 시에만 구성)
+        self.lexical = {name: LexicalIndex(pool_df) for name, (pool_df, *_) in retrievers.items()} if hybrid else {}
+        self.embedding_provider = embedding_provider
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.stats = {"requests": 0, "coalesced": 0, "rejected": 0, "timeouts": 0}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency))
+        self._slots = asyncio.Semaphore(max(1, max_concurrency))
+        self._inflight: dict[tuple, asyncio.Task] = {}
+
+    async def _run(self, activity: str, dataset: str, language: str, min_similarity: float) -> dict:
+        """실행 슬롯을 얻은 뒤 Worker 스레드에서 평가 (Event Loop 는 Block 하지 않음)"""
+        pool_df, index, _ = self.retrievers[dataset]
+        scope = semantic_scope(self.retriever_keys[dataset], language, round(min_similarity, 4), GPT_MODEL)
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, partial(
+                assess_activity, activity, self.api_key, pool_df, index, self.provider, self.tm,
+                language, min_similarity, cache=self.cache, semantic_cache=self.semantic_cache,
+                cache_scope=scope, semantic_threshold=self.semantic_threshold,
+                lexical=self.lexical.get(dataset)
+            ))
+
+    async def assess(self, activity: str, dataset: str, language: str = "Korean",
+                     min_similarity: float = MIN_SIMILARITY) -> dict:
+        """평가 결과 반환. 같은 Key 의 평가가 진행 중이면 새로 실행하지 않고 그 결과를 기다림
+
+        대기 한도 초과 시 ServiceBusy, timeout 초과 시 asyncio.TimeoutError 가 발생합니다.
+        Timeout 이 나도 진행 중인 평가는 취소하지 않으므로 같은 요청을 다시 보내면 이어서 기다립니다.
+        """
+        self.stats["requests"] += 1
+        key = (dataset, language, round(min_similarity, 4), " ".join(activity.split()))
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            if len(self._inflight) >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise ServiceBusy("처리 대기 중인 평가가 너무 많습니다.")
+            task = asyncio.ensure_future(self._run(key[3], dataset, language, min_similarity))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "datasets": list(self.retrievers),
+            "in_flight": len(self._inflight),
+            **self.stats,
+            "latency": metrics.summary(),
+        }
+
+
+def _json_response(payload: Any, status_code: int = 200, headers: dict | None = None) -> Response:
+    """numpy 스칼라가 포함된 결과도 직렬화하는 JSON 응답"""
+    body = json.dumps(payload, ensure_ascii=False, default=json_default)
+    return Response(body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def create_app(service: AssessmentService) -> Starlette:
+    """POST /assess, GET /health 라우트를 가진 ASGI 앱 생성"""
+
+    async def assess(request: Request) -> Response:
+        try:
+            body = await request.json()
+        except ValueError:
+            return JSONResponse({"error": "JSON 본문이 필요합니다."}, status_code=400)
+        if not isinstance(body, dict):
+            return JSONResponse({"error": "JSON 본문은 객체여야 합니다."}, status_code=400)
+        activity = str(body.get("activity") or "").strip()
+        dataset = body.get("dataset") or next(iter(service.retrievers))
+        language = body.get("language", "Korean")
+        if not isinstance(dataset, str) or not isinstance(language, str):
+            return JSONResponse({"error": "dataset / language 는 문자열이어야 합니다."}, status_code=400)
+        try:
+            min_similarity = float(body.get("min_similarity", MIN_SIMILARITY))
+        except (TypeError, ValueError):
+            return JSONResponse({"error": "min_similarity 는 숫자여야 합니다."}, status_code=400)
+        if not activity:
+            return JSONResponse({"error": "activity 를 입력하세요."}, status_code=400)
+        if dataset not in service.retrievers:
+            return JSONResponse({"error": f"지원하지 않는 데이터셋입니다: {dataset}"}, status_code=404)
+        if language not in LANGUAGE_CODES:
+            return JSONResponse({"error": f"지원하지 않는 언어입니다: {language}"}, status_code=400)
+
+        try:
+            result = await service.assess(activity, dataset, language, min_similarity)
+        except ServiceBusy as e:
+            return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "5"})
+        except asyncio.TimeoutError:
+            return JSONResponse({"error": "평가 시간이 초과되었습니다."}, status_code=504)
+        except AssessmentError as e:
+            return JSONResponse({"error": str(e)}, status_code=422)
+        except LLMError as e:
+            return JSONResponse({"error": str(e)}, status_code=502)
+        except RuntimeError as e:
+            # 임베딩 Provider 호출 실패 (embed_texts_with_openai 의 RuntimeError)
+            return JSONResponse({"error": str(e)}, status_code=502)
+        return _json_response(result)
+
+    async def health(request: Request) -> Response:
+        return JSONResponse(service.health())
+
+    return Starlette(routes=[
+        Route("/assess", assess, methods=["POST"]),
+        Route("/health", health, methods=["GET"]),
+    ])
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="위험성 평가 HTTP API 서버")
+    parser.add_argument("--datasets", nargs="+", default=["건축", "토목", "플랜트"])
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY", ""))
+    parser.add_argument("--embedding-provider", default="openai", choices=EMBEDDING_PROVIDERS)
+    parser.add_argument("--backend", default="flat", choices=INDEX_BACKENDS)
+    parser.add_argument("--translation-memory", default="translation_memory.sqlite3")
+    parser.add_argument("--response-cache", default="response_cache.sqlite3", help="Phase 1/2 GPT 응답 캐시")
+    parser.add_argument("--no-response-cache", action="store_true", help="응답 캐시를 사용하지 않고 새로 생성")
+    parser.add_argument("--semantic-cache", default="semantic_cache.sqlite3", help="유사 작업활동 평가 결과 캐시")
+    parser.add_argument("--semantic-threshold", type=float, default=SEMANTIC_CACHE_THRESHOLD)
+    parser.add_argument("--no-semantic-cache", action="store_true", help="유사 작업활동 결과를 재사용하지 않음")
+    parser.add_argument("--hybrid", action="store_true", help="문자 n-gram BM25 검색을 함께 사용 (임베딩 장애 시 단독 사용)")
+    parser.add_argument("--max-concurrency", type=int, default=SERVICE_MAX_CONCURRENCY)
+    parser.add_argument("--max-pending", type=int, default=SERVICE_MAX_PENDING)
+    parser.add_argument("--timeout", type=float, default=SERVICE_REQUEST_TIMEOUT)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    # 데이터셋별 인덱스를 기동 시 1회 구성 (임베딩/학습된 인덱스는 파일 옆 저장소 재사용)
+    retrievers, retriever_keys = {}, {}
+    for name in args.datasets:
+        dataset_path = resolve_dataset_path(name, "Korean")
+        retrievers[name] = build_retriever(load_dataset(name), dataset_path, args.embedding_provider,
+                                           args.backend, args.api_key)
+        retriever_keys[name] = (name, dataset_file_signature(dataset_path), args.embedding_provider, args.backend)
+    service = AssessmentService(
+        retrievers, args.api_key, args.embedding_provider, TranslationMemory(args.translation_memory),
+        cache=None if args.no_response_cache else ResponseCache(args.response_cache),
+        semantic_cache=None if args.no_semantic_cache else SemanticCache(args.semantic_cache),
+        semantic_threshold=args.semantic_threshold, hybrid=args.hybrid, retriever_keys=retriever_keys,
+        max_concurrency=args.max_concurrency, max_pending=args.max_pending, timeout=args.timeout
+    )
+    uvicorn.run(create_app(service), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# Translation (한국어 ↔ 영어 ↔ 중국어)
+# -----------------------------------------------------------------------------
+# 데이터셋 컬럼 번역 프롬프트와 번역 메모리(TranslationMemory) 연동 함수를 정의합니다.
+# 앱(stream.py)과 Offline Corpus Build(corpus_build.py)가 동일한 프롬프트/Key 를 사용하므로
+# Build 단계에서 번역한 결과를 앱이 그대로 재사용할 수 있습니다.
+#
+# translate_batch 는 N 행 × M 필드를 하나의 JSON 요청으로 묶어 번역하여 호출 수를 줄이고,
+# 응답 파싱/검증에 실패한 항목만 개별 호출로 다시 번역합니다.
+# -----------------------------------------------------------------------------
+
+import json
+import re
+from typing import Callable
+
+from llm import GPT_MODEL, LLMError, chat_completion, generate_or_empty, run_parallel
+from translation_memory import TranslationMemory
+
+# 결과 언어 → 컬럼 접미사 (예: activity_en, hazard_zh)
+LANGUAGE_CODES = {"Korean": "ko", "English": "en", "Chinese": "zh"}
+
+# JSON 배치 번역 요청당 입력 토큰 예산(문자 수 기준 보수적 추정) / 응답 최대 토큰
+BATCH_MAX_INPUT_TOKENS = 1500
+BATCH_MAX_OUTPUT_TOKENS = 4096
+
+# 번역 대상 필드: (한국어 원본 컬럼, 영어 번역 프롬프트)
+TRANSLATION_FIELDS = {
+    "activity": (
+        "작업활동 및 내용",
+        "Translate the following construction work activity into English. "
+        "Only provide the translation:\n\n"
+    ),
+    "hazard": (
+        "유해위험요인 및 환경측면 영향",
+        "Translate the following construction hazard into English. "
+        "Only provide the translation:\n\n"
+    ),
+    "plan": (
+        "개선대책",
+        "Translate the following safety improvement measures into English. "
+        "Keep the numbered format. Only provide the translation:\n\n"
+    ),
+}
+
+
+def translate_to_english(text: str, field: str, api_key: str, tm: TranslationMemory,
+                         source_lang: str = "Korean",
+                         generate_fn: Callable[[str, str], str] = generate_or_empty) -> str:
+    """필드별 프롬프트로 영어 번역 (번역 메모리 우선, 실패 시 원문 반환)"""
+    prompt_prefix = TRANSLATION_FIELDS[field][1]
+    return tm.translate(str(text), source_lang, "English", GPT_MODEL,
+                        lambda t: generate_fn(prompt_prefix + t, api_key))
+
+
+def translate_from_english(content: str, target_language: str, api_key: str, tm: TranslationMemory,
+                           max_retries: int = 2,
+                           generate_fn: Callable[[str, str], str] = generate_or_empty) -> str:
+    """영어 결과 문자열을 target_language 로 번역 (번역 메모리 우선, 실패 시 원문 반환)"""
+    if target_language == "English" or not api_key or not content:
+        return content
+
+    def translate_fn(text: str) -> str:
+        prompt = f"Translate the following into {target_language}. Only provide the translation:\n\n{text}"
+        for _ in range(max_retries):
+            translated = generate_fn(prompt, api_key)
+            if translated:
+                return translated
+        return ""
+
+    return tm.translate(content, "English", target_language, GPT_MODEL, translate_fn)
+
+
+def _translate_one(text: str, field: str, source_lang: str, target_lang: str, api_key: str,
+                   tm: TranslationMemory) -> str:
+    """배치 번역 실패 시 사용하는 단건 번역 (필드별 프롬프트)"""
+    if target_lang == "English" and field in TRANSLATION_FIELDS:
+        return translate_to_english(text, field, api_key, tm, source_lang=source_lang)
+    return translate_from_english(text, target_lang, api_key, tm)
+
+
+def _split_by_budget(items: list[tuple[str, str]], max_tokens: int) -> list[list[tuple[str, str]]]:
+    """(key, text) 목록을 입력 토큰 예산(문자 수 추정) 단위 청크로 분할"""
+    chunks, current, current_tokens = [], [], 0
+    for key, text in items:
+        est_tokens = max(1, len(text))
+        if current and current_tokens + est_tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append((key, text))
+        current_tokens += est_tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _batch_prompt(chunk: list[tuple[str, str]], source_lang: str, target_lang: str) -> str:
+    """JSON 구조화 배치 번역 프롬프트"""
+    payload = json.dumps(dict(chunk), ensure_ascii=False, indent=1)
+    return (
+        f"Translate every value of the following JSON object from {source_lang} into {target_lang}. "
+        "Keys end with the field type: 'activity' = construction work activity, "
+        "'hazard' = construction hazard, 'plan' = safety improvement measures (keep the numbered format).\n"
+        "Respond with a JSON object that has exactly the same keys and only the translated values.\n\n"
+        + payload
+    )
+
+
+def _parse_batch_response(output: str, keys: list[str]) -> dict[str, str]:
+    """배치 응답 JSON 파싱 → 요청 Key 중 비어있지 않은 문자열 값만 반환"""
+    match = re.search(r"\{.*\}", output or "", re.DOTALL)
+    if not match:
+        return {}
+    try:
+        parsed = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+    return {k: parsed[k].strip() for k in keys if isinstance(parsed.get(k), str) and parsed[k].strip()}
+
+
+def translate_batch(rows: list[dict[str, str]], source_lang: str, target_lang: str, api_key: str,
+                    tm: TranslationMemory, max_input_tokens: int = BATCH_MAX_INPUT_TOKENS) -> list[dict[str, str]]:
+    """N 행 × M 필드({field: text}) 를 JSON 배치 요청으로 번역하여 같은 구조로 반환
+
+    번역 메모리에 있는 항목은 요청하지 않으며, 토큰 예산별로 나눈 청크는 병렬 전송합니다.
+    응답에서 누락/파싱 실패한 항목은 필드별 단건 번역으로 대체하고, 최종 실패 시 원문을 유지합니다.
+    """
+    results = [dict(row) for row in rows]
+    if source_lang == target_lang or not api_key:
+        return results
+
+    # 1️⃣ 번역 메모리 조회 → 미번역 (key, text) 수집 (동일 원문/필드는 한 번만 요청)
+    pending: dict[str, str] = {}
+    keys: dict[tuple[str, str], str] = {}
+    targets: dict[str, list[tuple[int, str]]] = {}
+    for i, row in enumerate(rows):
+        for field, text in row.items():
+            if not text:
+                continue
+            cached = tm.get(text, source_lang, target_lang, GPT_MODEL)
+            if cached is not None:
+                results[i][field] = cached
+                continue
+            key = keys.get((field, text))
+            if key is None:
+                key = keys[(field, text)] = f"{len(pending)}_{field}"
+                pending[key] = text
+            targets.setdefault(key, []).append((i, field))
+    if not pending:
+        return results
+
+    # 2️⃣ 토큰 예산 단위 청크를 JSON 배치 요청으로 병렬 전송
+    chunks = _split_by_budget(list(pending.items()), max_input_tokens)
+
+    def run_chunk(chunk: list[tuple[str, str]]) -> dict[str, str]:
+        try:
+            output = chat_completion(_batch_prompt(chunk, source_lang, target_lang), api_key,
+                                     max_tokens=BATCH_MAX_OUTPUT_TOKENS)
+        except LLMError:
+            return {}
+        return _parse_batch_response(output, [k for k, _ in chunk])
+
+    translated: dict[str, str] = {}
+    for parsed in run_parallel([lambda c=chunk: run_chunk(c) for chunk in chunks]):
+        translated.update(parsed or {})
+    for key, value in translated.items():
+        tm.put(pending[key], source_lang, target_lang, GPT_MODEL, value)
+
+    # 3️⃣ 누락 항목은 필드별 단건 번역으로 Fallback
+    missing = [key for key in pending if key not in translated]
+    fallbacks = run_parallel([
+        lambda k=key: _translate_one(pending[k], k.split("_", 1)[1], source_lang, target_lang, api_key, tm)
+        for key in missing
+    ])
+    for key, value in zip(missing, fallbacks):
+        translated[key] = value or pending[key]
+
+    for key, cells in targets.items():
+        for i, field in cells:
+            results[i][field] = translated[key]
+    return results
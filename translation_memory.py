@@ -0,0 +1,98 @@
+# Translation Memory (번역 메모리)
+# -----------------------------------------------------------------------------
+# GPT 번역 결과를 (원문, 원문 언어, 대상 언어, 모델) Key 로 저장하여 재사용합니다.
+#  - 영구 저장소: SQLite (프로세스/재시작 간 공유)
+#  - 메모리 캐시: LRU (OrderedDict), 최대 max_memory_items 개
+#  - hit / miss 카운터로 재사용률 확인
+# 동일한 데이터셋 행/작업활동은 한 번 번역된 이후 LLM 호출 없이 반환됩니다.
+# -----------------------------------------------------------------------------
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+
+def translation_key(text: str, source_lang: str, target_lang: str, model: str) -> str:
+    """번역 메모리 Key (SHA-256 hex)"""
+    raw = "\x1f".join([model, source_lang, target_lang, text])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """SQLite 영구 저장 + 메모리 LRU 번역 캐시 (thread-safe)"""
+
+    def __init__(self, path: str = "translation_memory.sqlite3", max_memory_items: int = 10000):
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self.hits = 0
+        self.misses = 0
+        self._lru: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY, source_text TEXT, source_lang TEXT, target_lang TEXT,"
+            " model TEXT, translation TEXT, created_at REAL)"
+        )
+        self._conn.commit()
+
+    def _remember(self, key: str, translation: str) -> None:
+        self._lru[key] = translation
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_memory_items:
+            self._lru.popitem(last=False)
+
+    def get(self, text: str, source_lang: str, target_lang: str, model: str) -> str | None:
+        """저장된 번역 반환 (LRU → SQLite 순 조회). 없으면 None"""
+        key = translation_key(text, source_lang, target_lang, model)
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return self._lru[key]
+            row = self._conn.execute(
+                "SELECT translation FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._remember(key, row[0])
+            self.hits += 1
+            return row[0]
+
+    def put(self, text: str, source_lang: str, target_lang: str, model: str, translation: str) -> None:
+        """번역 결과 저장 (빈 문자열은 저장하지 않음)"""
+        if not translation:
+            return
+        key = translation_key(text, source_lang, target_lang, model)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, text, source_lang, target_lang, model, translation, time.time()),
+            )
+            self._conn.commit()
+            self._remember(key, translation)
+
+    def translate(self, text: str, source_lang: str, target_lang: str, model: str,
+                  translate_fn: Callable[[str], str]) -> str:
+        """번역 메모리에 없을 때만 translate_fn(text) 호출 후 저장. 실패(빈 결과) 시 원문 반환"""
+        cached = self.get(text, source_lang, target_lang, model)
+        if cached is not None:
+            return cached
+        translated = translate_fn(text)
+        self.put(text, source_lang, target_lang, model, translated)
+        return translated or text
+
+    def stats(self) -> dict:
+        """hit / miss / hit_rate / 메모리 항목 수"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_items": len(self._lru),
+        }
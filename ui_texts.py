@@ -0,0 +1,386 @@
+# UI Texts (다국어 화면 텍스트 및 표시 서식)
+# -----------------------------------------------------------------------------
+# stream.py 는 위젯 조작/언어 변경 때마다 스크립트 전체를 다시 실행(rerun)하므로,
+# 변하지 않는 텍스트 테이블과 표시용 함수는 이 모듈에 두어 프로세스당 1회만 생성합니다.
+# -----------------------------------------------------------------------------
+
+import re
+
+
+# -----------------------------------------------------------------------------
+# ⚙️  다국어 시스템 텍스트 (UI Label) 정의
+# -----------------------------------------------------------------------------
+# 화면 표시용 텍스트를 Korean / English / Chinese 로 분리하여 dict 로 관리합니다.
+# 화면 전환 시 선택된 언어에 따라 해당 라벨을 사용합니다.
+# -----------------------------------------------------------------------------
+
+# ----------------- 언어별 시스템 다국어 텍스트 (3가지 언어 지원) -----------------
+system_texts = {
+    "Korean": {
+        "title": "Artificial Intelligence Risk Assessment",
+        "tab_overview": "시스템 개요",
+        "tab_phase": "위험성 평가 & 개선대책",
+        "overview_header": "LLM 기반 위험성평가 시스템",
+        "overview_text": (
+            "Doosan Enerbility AI Risk Assessment는 국내 및 해외 건설현장의 '수시 위험성 평가' 및 "
+            "'노동부 중대재해 사례'를 학습하여 개발된 자동 위험성평가 프로그램입니다. "
+            "생성된 위험성 평가는 반드시 수시 위험성평가 심의회를 통해 검증 후 사용하시기 바랍니다."
+        ),
+        "features_title": "시스템 특징 및 구성요소",
+        "phase_features": (
+            "#### Phase 1: 위험성 평가 자동화\n"
+            "- 공정별 작업활동에 따른 위험성평가 데이터 학습\n"
+            "- 작업활동 입력 시 유해위험요인 자동 예측 \n"
+            "- 유사 사례 검색 및 표시 \n"
+            "- LLM 기반 위험도(빈도, 강도, T) 측정\n"
+            "- 위험등급(A–E) 자동 산정\n\n"
+            "#### Phase 2: 개선대책 자동 생성\n"
+            "- 맞춤형 개선대책 자동 생성 \n"
+            "- 다국어(한국어/영어/중국어) 개선대책 생성 지원\n"
+            "- 개선 전후 위험도(T) 자동 비교 분석\n"
+            "- 공종/공정별 최적 개선대책 데이터베이스 구축"
+        ),
+        "supported_languages_label": "지원 언어",
+        "supported_languages_value": "3개",
+        "supported_languages_detail": "한/영/중",
+        "assessment_phases_label": "평가 단계",
+        "assessment_phases_value": "2단계",
+        "assessment_phases_detail": "Phase1+Phase2",
+        "risk_grades_label": "위험등급",
+        "risk_grades_value": "5등급",
+        "risk_grades_detail": "A~E",
+        "api_key_label": "OpenAI API 키를 입력하세요:",
+        "dataset_label": "데이터셋 선택",
+        "load_data_btn": "데이터 로드 및 인덱스 구성",
+        "api_key_warning": "계속하려면 OpenAI API 키를 입력하세요.",
+        "data_loading": "데이터를 불러오고 인덱스를 구성하는 중...",
+        "data_load_success": "데이터 로드 및 인덱스 구성 완료! (총 {max_texts}개 항목 처리)",
+        "load_first_warning": "먼저 [데이터 로드 및 인덱스 구성] 버튼을 클릭하세요.",
+        "activity_label": "작업활동:",
+        "include_similar_cases": "유사 사례 포함",
+        "run_assessment": "🚀 위험성 평가 실행",
+        "activity_warning": "작업활동을 입력하세요.",
+        "performing_assessment": "위험성 평가를 수행하는 중...",
+        "phase1_results": "📋 Phase 1: 위험성 평가 결과",
+        "work_activity": "작업활동",
+        "predicted_hazard": "예측된 유해위험요인",
+        "risk_grade_display": "위험등급",
+        "t_value_display": "T값",
+        "risk_level_text": "위험도 : 빈도 {freq}, 강도 {intensity}, T {T} ({grade})",
+        "similar_cases_section": "🔍 유사한 사례",
+        "case_number": "사례",
+        "phase2_results": "🛠️ Phase 2: 개선대책 생성 결과",
+        "improvement_plan_header": "개선대책",
+        "risk_improvement_header": "위험도 개선 결과",
+        "comparison_columns": ["항목", "개선 전", "개선 후"],
+        "risk_reduction_label": "위험 감소율 (RRR)",
+        "risk_visualization": "📊 위험도 변화 시각화",
+        "before_improvement": "개선 전",
+        "after_improvement": "개선 후",
+        "grade_label": "등급",
+        "download_results": "💾 결과 다운로드",
+        "excel_export": "📥 결과 Excel 다운로드",
+        "col_activity_header": "작업활동 및 내용 Work Sequence",
+        "col_hazard_header": "유해위험요인 및 환경측면 영향 Hazarous Factors",
+        "col_ehs_header": "EHS",
+        "col_risk_likelihood_header": "위험성 Risk – 빈도 likelihood",
+        "col_risk_severity_header": "위험성 Risk – 강도 severity",
+        "col_control_header": "개선대책 및 세부관리방안 Control Measures",
+        "col_incharge_header": "개선담당자 In Charge",
+        "col_duedate_header": "개선일자 Correction Due Date",
+        "col_after_likelihood_header": "위험성 Risk – 빈도 likelihood",
+        "col_after_severity_header": "위험성 Risk – 강도 severity",
+        "frequency_label": "빈도",
+        "intensity_label": "강도",
+        "t_value_label": "T값",
+        "risk_grade_label": "위험등급",
+        "dataset_architecture": "건축",
+        "dataset_civil": "토목",
+        "dataset_plant": "플랜트",
+        "item_label": "항목",
+        "value_label": "값",
+        "stream_output_label": "실시간 생성 표시 (Streaming)",
+        "embedding_provider_label": "임베딩 모델",
+        "similarity_label": "유사도",
+        "keyword_coverage_label": "키워드 일치율",
+        "min_similarity_label": "최소 유사도 (Cosine)",
+        "response_cache_label": "응답 캐시 사용 (동일 평가 즉시 반환)",
+        "semantic_cache_label": "유사 작업활동 평가 결과 재사용",
+        "semantic_threshold_label": "결과 재사용 유사도 기준 (Cosine)",
+        "federated_search_label": "전체 데이터셋 연합 검색",
+        "federated_weight_label": "{dataset} 가중치",
+        "federated_empty_warning": "가중치가 0 보다 큰 데이터셋을 하나 이상 선택하세요.",
+        "source_dataset_label": "출처 데이터셋",
+        "hybrid_search_label": "키워드 검색 함께 사용 (Hybrid)",
+        "lexical_fallback_warning": "임베딩 응답이 없어 키워드(n-gram) 검색 결과만으로 평가합니다.",
+        "semantic_cache_hit": "♻️ 이전에 평가한 유사 작업활동의 결과입니다: \"{activity}\" (유사도 {similarity:.2f})",
+        "tab_batch": "작업분석 일괄 평가",
+        "batch_description": (
+            "작업분석 및 예정공정표(Job Analysis) 시트 양식의 Excel 을 업로드하면 모든 작업순서에 대해 "
+            "유해위험요인, 위험도, 개선대책을 한 번에 생성합니다. "
+            "중단된 경우 같은 파일로 다시 실행하면 완료된 작업순서는 건너뜁니다."
+        ),
+        "batch_upload_label": "작업분석 Excel 업로드",
+        "batch_concurrency_label": "동시 평가 수",
+        "batch_rows_info": "작업순서 {n}건",
+        "batch_run": "🚀 일괄 위험성 평가 실행",
+        "batch_progress": "일괄 평가 진행 중 ({done}/{total})",
+        "batch_done": "일괄 평가 완료: 성공 {ok}건 / 실패 {failed}건",
+        "batch_failed_rows": "실패한 작업순서 (다시 실행하면 재시도)"
+    },
+    "English": {
+        "title": "Artificial Intelligence Risk Assessment",
+        "tab_overview": "System Overview",
+        "tab_phase": "Risk Assessment & Improvement",
+        "overview_header": "LLM-based Risk Assessment System",
+        "overview_text": (
+            "Doosan Enerbility AI Risk Assessment is an automated program trained on on-demand risk-assessment reports "
+            "from domestic and overseas construction sites and major-accident cases compiled by Korea's Ministry of Employment "
+            "and Labor. Please ensure that every generated assessment is reviewed and approved by the On-Demand Risk Assessment "
+            "Committee before it is used."
+        ),
+        "features_title": "System Features and Components",
+        "phase_features": (
+            "#### Phase 1: Risk Assessment Automation\n"
+            "- Learning risk assessment data per work activity\n"
+            "- Automatic hazard prediction when work activities are entered \n"
+            "- Similar case search & display \n"
+            "- LLM-based risk level (frequency, intensity, T) measurement (internal: English)\n"
+            "- Automatic risk grade (A–E) calculation\n\n"
+            "#### Phase 2: Automatic Generation of Improvement Measures\n"
+            "- Customized improvement measures generation \n"
+            "- Multilingual (Korean/English/Chinese) improvement measure support\n"
+            "- Automatic comparative analysis before/after improvement\n"
+            "- Database of optimal improvement measures per process"
+        ),
+        "supported_languages_label": "Supported Languages",
+        "supported_languages_value": "3",
+        "supported_languages_detail": "KOR/ENG/CHN",
+        "assessment_phases_label": "Assessment Phases",
+        "assessment_phases_value": "2",
+        "assessment_phases_detail": "Phase1+Phase2",
+        "risk_grades_label": "Risk Grades",
+        "risk_grades_value": "5",
+        "risk_grades_detail": "A–E",
+        "api_key_label": "Enter OpenAI API Key:",
+        "dataset_label": "Select Dataset",
+        "load_data_btn": "Load Data and Configure Index",
+        "api_key_warning": "Please enter an OpenAI API key to continue.",
+        "data_loading": "Loading data and configuring index...",
+        "data_load_success": "Data load and index configuration complete! (Total {max_texts} items processed)",
+        "load_first_warning": "Please click [Load Data and Configure Index] first.",
+        "activity_label": "Work Activity:",
+        "include_similar_cases": "Include Similar Cases",
+        "run_assessment": "🚀 Run Risk Assessment",
+        "activity_warning": "Please enter a work activity.",
+        "performing_assessment": "Performing risk assessment...",
+        "phase1_results": "📋 Phase 1: Risk Assessment Results",
+        "work_activity": "Work Activity",
+        "predicted_hazard": "Predicted Hazard",
+        "risk_grade_display": "Risk Grade",
+        "t_value_display": "T Value",
+        "risk_level_text": "Risk Level : Frequency {freq}, Intensity {intensity}, T {T} (Grade {grade})",
+        "similar_cases_section": "🔍 Similar Cases",
+        "case_number": "Case",
+        "phase2_results": "🛠️ Phase 2: Improvement Measures Results",
+        "improvement_plan_header": "Improvement Plan",
+        "risk_improvement_header": "Risk Improvement Results",
+        "comparison_columns": ["Item", "Before Improvement", "After Improvement"],
+        "risk_reduction_label": "Risk Reduction Rate (RRR)",
+        "risk_visualization": "📊 Risk Level Change Visualization",
+        "before_improvement": "Before Improvement",
+        "after_improvement": "After Improvement",
+        "grade_label": "Grade",
+        "download_results": "💾 Download Results",
+        "excel_export": "📥 Download Excel Report",
+        "col_activity_header": "작업활동 및 내용 Work Sequence",
+        "col_hazard_header": "유해위험요인 및 환경측면 영향 Hazarous Factors",
+        "col_ehs_header": "EHS",
+        "col_risk_likelihood_header": "위험성 Risk – 빈도 likelihood",
+        "col_risk_severity_header": "위험성 Risk – 강도 severity",
+        "col_control_header": "개선대책 및 세부관리방안 Control Measures",
+        "col_incharge_header": "개선담당자 In Charge",
+        "col_duedate_header": "개선일자 Correction Due Date",
+        "col_after_likelihood_header": "위험성 Risk – 빈도 likelihood",
+        "col_after_severity_header": "위험성 Risk – 강도 severity",
+        "frequency_label": "Frequency",
+        "intensity_label": "Intensity",
+        "t_value_label": "T Value",
+        "risk_grade_label": "Risk Grade",
+        "dataset_architecture": "Architecture",
+        "dataset_civil": "Civil",
+        "dataset_plant": "Plant",
+        "item_label": "Item",
+        "value_label": "Value",
+        "stream_output_label": "Show live generation (Streaming)",
+        "embedding_provider_label": "Embedding Model",
+        "similarity_label": "Similarity",
+        "keyword_coverage_label": "Keyword match",
+        "min_similarity_label": "Minimum Similarity (Cosine)",
+        "response_cache_label": "Use response cache (instant repeat assessments)",
+        "semantic_cache_label": "Reuse results of similar activities",
+        "semantic_threshold_label": "Result reuse threshold (Cosine)",
+        "federated_search_label": "Federated search across all datasets",
+        "federated_weight_label": "{dataset} weight",
+        "federated_empty_warning": "Give at least one dataset a weight greater than 0.",
+        "source_dataset_label": "Source dataset",
+        "hybrid_search_label": "Combine keyword search (hybrid)",
+        "lexical_fallback_warning": "Embedding service unavailable; assessing with keyword (n-gram) search results only.",
+        "semantic_cache_hit": "♻️ Reused the assessment of a similar activity: \"{activity}\" (similarity {similarity:.2f})",
+        "tab_batch": "Batch Job Analysis",
+        "batch_description": (
+            "Upload an Excel file in the Job Analysis sheet layout to generate hazards, risk levels and "
+            "improvement measures for every work sequence at once. "
+            "If a run is interrupted, run the same file again and completed work sequences are skipped."
+        ),
+        "batch_upload_label": "Upload Job Analysis Excel",
+        "batch_concurrency_label": "Concurrent Assessments",
+        "batch_rows_info": "{n} work sequences",
+        "batch_run": "🚀 Run Batch Risk Assessment",
+        "batch_progress": "Batch assessment in progress ({done}/{total})",
+        "batch_done": "Batch assessment complete: {ok} succeeded / {failed} failed",
+        "batch_failed_rows": "Failed work sequences (retried on the next run)"
+    },
+    "Chinese": {
+        "title": "Artificial Intelligence Risk Assessment",
+        "tab_overview": "系统概述",
+        "tab_phase": "风险评估 & 改进措施",
+        "overview_header": "基于LLM的风险评估系统",
+        "overview_text": (
+            "Doosan Enerbility AI 风险评估系统是一款自动化风险评估程序，基于国内外施工现场的'临时风险评估'数据及韩国劳工部 "
+            "重大事故案例训练开发而成。生成的风险评估结果必须经过临时风险评估审议委员会的审核后方可使用。"
+        ),
+        "features_title": "系统特点和组件",
+        "phase_features": (
+            "#### 第1阶段：风险评估自动化\n"
+            "- 按工作活动学习风险评估数据\n"
+            "- 输入工作活动时自动预测危害 \n"
+            "- 相似案例搜索与显示 \n"
+            "- 基于LLM的风险等级\n"
+            "- 自动计算风险等级(A–E)\n\n"
+            "#### 第2阶段：自动生成改进措施\n"
+            "- 定制化改进措施自动生成 (内部：英语)\n"
+            "- 多语言 (韩/英/中) 改进措施支持\n"
+            "- 自动比较改进前后风险等级\n"
+            "- 按工序管理最优改进措施数据库"
+        ),
+        "supported_languages_label": "支持语言",
+        "supported_languages_value": "3 种",
+        "supported_languages_detail": "韩/英/中",
+        "assessment_phases_label": "评估阶段",
+        "assessment_phases_value": "2 阶段",
+        "assessment_phases_detail": "Phase1+Phase2",
+        "risk_grades_label": "风险等级",
+        "risk_grades_value": "5 等级",
+        "risk_grades_detail": "A–E",
+        "api_key_label": "输入 OpenAI API 密钥：",
+        "dataset_label": "选择数据集",
+        "load_data_btn": "加载数据并配置索引",
+        "api_key_warning": "请输入 OpenAI API 密钥以继续。",
+        "data_loading": "正在加载数据并配置索引...",
+        "data_load_success": "数据加载与索引配置完成！(共处理 {max_texts} 项目)",
+        "load_first_warning": "请先点击 [加载数据并配置索引]。",
+        "activity_label": "工作活动：",
+        "include_similar_cases": "包括相似案例",
+        "run_assessment": "🚀 运行风险评估",
+        "activity_warning": "请输入工作活动。",
+        "performing_assessment": "正在进行风险评估...",
+        "phase1_results": "📋 第1阶段：风险评估结果",
+        "work_activity": "工作活动",
+        "predicted_hazard": "预测危害",
+        "risk_grade_display": "风险等级",
+        "t_value_display": "T 值",
+        "risk_level_text": "风险等级 : 频率 {freq}, 强度 {intensity}, T {T} (等级 {grade})",
+        "similar_cases_section": "🔍 相似案例",
+        "case_number": "案例",
+        "phase2_results": "🛠️ 第2阶段：改进措施结果",
+        "improvement_plan_header": "改进措施",
+        "risk_improvement_header": "风险改进结果",
+        "comparison_columns": ["项目", "改进前", "改进后"],
+        "risk_reduction_label": "风险降低率 (RRR)",
+        "risk_visualization": "📊 风险等级变化可视化",
+        "before_improvement": "改进前",
+        "after_improvement": "改进后",
+        "grade_label": "等级",
+        "download_results": "💾 下载结果",
+        "excel_export": "📥 下载 Excel 报表",
+        "col_activity_header": "작업활동 및 내용 Work Sequence",
+        "col_hazard_header": "유해위험요인 및 환경측면 영향 Hazarous Factors",
+        "col_ehs_header": "EHS",
+        "col_risk_likelihood_header": "위험성 Risk – 빈도 likelihood",
+        "col_risk_severity_header": "위험성 Risk – 강도 severity",
+        "col_control_header": "개선대책 및 세부관리방안 Control Measures",
+        "col_incharge_header": "개선담당자 In Charge",
+        "col_duedate_header": "개선일자 Correction Due Date",
+        "col_after_likelihood_header": "위험성 Risk – 빈도 likelihood",
+        "col_after_severity_header": "위험성 Risk – 강도 severity",
+        "frequency_label": "频率",
+        "intensity_label": "强度",
+        "t_value_label": "T值",
+        "risk_grade_label": "风险等级",
+        "dataset_architecture": "建筑",
+        "dataset_civil": "土木",
+        "dataset_plant": "工厂",
+        "item_label": "项目",
+        "value_label": "值",
+        "stream_output_label": "实时显示生成内容 (Streaming)",
+        "embedding_provider_label": "嵌入模型",
+        "similarity_label": "相似度",
+        "keyword_coverage_label": "关键词匹配率",
+        "min_similarity_label": "最低相似度 (Cosine)",
+        "response_cache_label": "使用响应缓存 (重复评估即时返回)",
+        "semantic_cache_label": "复用相似作业活动的评估结果",
+        "semantic_threshold_label": "结果复用相似度阈值 (Cosine)",
+        "federated_search_label": "跨全部数据集联合检索",
+        "federated_weight_label": "{dataset} 权重",
+        "federated_empty_warning": "请至少为一个数据集设置大于 0 的权重。",
+        "source_dataset_label": "来源数据集",
+        "hybrid_search_label": "结合关键词检索 (混合)",
+        "lexical_fallback_warning": "嵌入服务无响应，仅使用关键词 (n-gram) 检索结果进行评估。",
+        "semantic_cache_hit": "♻️ 复用了相似作业活动的评估结果: \"{activity}\" (相似度 {similarity:.2f})",
+        "tab_batch": "作业分析批量评估",
+        "batch_description": (
+            "上传作业分析(Job Analysis)表格式的 Excel，即可一次性为所有作业顺序生成危害、风险等级和改进措施。"
+            "如果中断，使用同一文件重新运行时将跳过已完成的作业顺序。"
+        ),
+        "batch_upload_label": "上传作业分析 Excel",
+        "batch_concurrency_label": "并发评估数",
+        "batch_rows_info": "作业顺序 {n} 项",
+        "batch_run": "🚀 运行批量风险评估",
+        "batch_progress": "批量评估进行中 ({done}/{total})",
+        "batch_done": "批量评估完成：成功 {ok} 项 / 失败 {failed} 项",
+        "batch_failed_rows": "失败的作业顺序 (再次运行时重试)"
+    }
+}
+
+
+def get_grade_color(grade: str) -> str:
+    """위험 등급별로 시각화에 사용할 HEX 색상을 반환합니다."""
+    colors = {
+        'A': '#ff1744',    # 빨간색 (매우 위험)
+        'B': '#ff9800',    # 주황색 (위험)
+        'C': '#4caf50',    # 초록색 (보통)
+        'D': '#4caf50',    # 초록색 (낮음)
+        'E': '#4caf50',    # 초록색 (매우 낮음)
+    }
+    return colors.get(grade, '#808080')
+
+
+# ─── 개선대책 번호 기준 줄바꿈 함수 ─────────────────
+def format_improvement_plan_for_display(plan_text: str) -> str:
+    """'1) ... 2) ...' 형식 개선대책 문자열을 줄바꿈 처리하여 가독성 향상"""
+    if not plan_text:
+        return ""
+
+    # (1) 기존 개행문자 모두 제거하고 한 줄로 만든 뒤
+    single_line = plan_text.replace("\r\n", " ").replace("\r", " ").replace("\n", " ")
+
+    # (2) 숫자) 패턴(예: '2)') 앞에 '\n' 삽입
+    formatted = re.sub(r"(?<!\n)(\d\))", r"\n\1", single_line)
+
+    # (3) 첫 글자가 불필요한 \n 인 경우 제거
+    if formatted.startswith("\n"):
+        formatted = formatted[1:]
+
+    return formatted
+# ─────────────────────────────────────────────────────────────────────
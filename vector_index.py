@@ -0,0 +1,148 @@
+# Vector Index Factory (FAISS)
+# -----------------------------------------------------------------------------
+# 유사사례 Retrieval 용 FAISS 인덱스를 설정값(backend)에 따라 생성합니다.
+#  - flat    : Brute-force (정확도 기준선)
+#  - ivf     : IVF-Flat  (k-means 학습 후 nprobe 개 클러스터만 탐색)
+#  - ivfpq   : IVF-PQ    (Product Quantization 으로 메모리 절감)
+#  - hnsw    : HNSW 그래프 (학습 불필요, 높은 Recall/QPS)
+# 학습된 인덱스는 faiss.write_index / read_index 로 파일에 저장하여 재사용합니다.
+# ids 를 지정하면 검색 결과가 위치 대신 row ID 를 반환하며(flat/hnsw 는 IndexIDMap, IVF 는 자체 ID),
+# load_or_sync_index 는 저장된 인덱스에 추가된 행만 더하고 삭제된 행만 제거합니다.
+# -----------------------------------------------------------------------------
+
+import os
+
+import faiss
+import numpy as np
+
+INDEX_BACKENDS = ("flat", "ivf", "ivfpq", "hnsw")
+
+
+def _default_nlist(n: int) -> int:
+    """IVF 클러스터 수: ~4√n, 단 클러스터당 학습 샘플 39개 이상 확보"""
+    return max(1, min(int(4 * np.sqrt(n)), n // 39))
+
+
+def _default_pq_m(dim: int) -> int:
+    """PQ sub-quantizer 개수: dim 의 약수 중 64 이하 최댓값"""
+    return max(m for m in range(1, min(dim, 64) + 1) if dim % m == 0)
+
+
+def build_index(vecs: np.ndarray, backend: str = "flat", metric: int = faiss.METRIC_L2,
+                nlist: int | None = None, nprobe: int | None = None, pq_m: int | None = None,
+                hnsw_m: int = 32, ef_construction: int = 80, ef_search: int = 64,
+                ids: np.ndarray | None = None) -> faiss.Index:
+    """backend 종류에 맞는 인덱스를 생성하고 (필요 시 학습 후) vecs 를 추가하여 반환
+
+    ids(int64) 를 지정하면 각 벡터를 해당 ID 로 추가하여 search 결과로 ID 를 반환합니다.
+    """
+    vecs = np.ascontiguousarray(vecs, dtype="float32")
+    n, dim = vecs.shape
+
+    if backend == "flat":
+        index = faiss.IndexFlat(dim, metric)
+    elif backend in ("ivf", "ivfpq"):
+        nlist = nlist or _default_nlist(n)
+        quantizer = faiss.IndexFlat(dim, metric)
+        if backend == "ivf":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, metric)
+        else:
+            # 코드북(2^nbits) 당 학습 샘플 39개 이상이 필요하므로 소규모 데이터에서는 nbits 축소
+            nbits = int(min(8, max(1, np.log2(max(2, n / 39)))))
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m or _default_pq_m(dim), nbits, metric)
+        index.train(vecs)
+        index.nprobe = nprobe or min(nlist, max(1, nlist // 8), 32)
+    elif backend == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m, metric)
+        index.hnsw.efConstruction = ef_construction
+        index.hnsw.efSearch = ef_search
+    else:
+        raise ValueError(f"지원하지 않는 인덱스 backend 입니다: {backend} (지원: {', '.join(INDEX_BACKENDS)})")
+
+    if ids is None:
+        index.add(vecs)
+        return index
+    if backend in ("flat", "hnsw"):
+        index = faiss.IndexIDMap(index)
+    index.add_with_ids(vecs, np.ascontiguousarray(ids, dtype="int64"))
+    return index
+
+
+def normalize_vectors(vecs: np.ndarray) -> np.ndarray:
+    """Cosine 유사도 검색용 L2 정규화 사본 반환 (원본/memory-map 은 수정하지 않음)"""
+    out = np.array(vecs, dtype="float32", copy=True, order="C")
+    faiss.normalize_L2(out)
+    return out
+
+
+def save_index(index: faiss.Index, path: str) -> None:
+    """faiss.write_index 로 임시 파일에 기록 후 원자적으로 교체"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _ids_path(cache_path: str) -> str:
+    """ID 매핑 인덱스와 함께 저장하는 row ID 목록 파일 경로"""
+    return f"{os.path.splitext(cache_path)[0]}.ids.npy"
+
+
+def _load_id_index(cache_path: str | None, dim: int) -> tuple[faiss.Index | None, np.ndarray | None]:
+    """저장된 (ID 매핑 인덱스, row ID 목록). 없거나 손상/불일치 시 (None, None)"""
+    if not (cache_path and os.path.exists(cache_path) and os.path.exists(_ids_path(cache_path))):
+        return None, None
+    try:
+        index = faiss.read_index(cache_path)
+        stored = np.load(_ids_path(cache_path))
+    except (RuntimeError, OSError, ValueError):
+        return None, None
+    if index.d != dim or index.ntotal != len(stored):
+        return None, None
+    return index, stored
+
+
+def load_or_sync_index(vecs: np.ndarray, ids: np.ndarray, backend: str, cache_path: str | None = None,
+                       **params) -> tuple[faiss.Index, dict]:
+    """cache_path 의 ID 매핑 인덱스를 현재 (ids, vecs) 와 동기화하여 반환
+
+    저장된 row ID 목록과 비교하여 새 ID 의 벡터만 add_with_ids 로 추가하고, 없어진 ID 는
+    remove_ids 로 삭제합니다 (IVF 는 기존 학습 결과를 그대로 사용). 저장된 인덱스가 없거나
+    삭제를 지원하지 않는 backend(hnsw)에서 삭제가 필요하면 새로 생성합니다.
+    flat 은 벡터 복사만으로 생성되므로 파일에 저장하지 않고 매번 새로 생성합니다.
+    0 벡터(임베딩 실패 행)는 인덱스에 넣지 않으므로, 이후 임베딩에 성공하면 새 ID 로 추가됩니다.
+    반환: (인덱스, {"added": 추가 수, "removed": 삭제 수, "rebuilt": 새로 생성 여부})
+    """
+    vecs = np.ascontiguousarray(vecs, dtype="float32")
+    ids = np.ascontiguousarray(ids, dtype="int64")
+    valid = np.linalg.norm(vecs, axis=1) > 0
+    if not valid.all():
+        vecs, ids = vecs[valid], ids[valid]
+    index, stored = _load_id_index(cache_path, vecs.shape[1])
+    stats = None
+    if index is not None:
+        added = ~np.isin(ids, stored)
+        removed = stored[~np.isin(stored, ids)]
+        try:
+            if len(removed):
+                index.remove_ids(removed)
+            if added.any():
+                index.add_with_ids(vecs[added], ids[added])
+            stats = {"added": int(added.sum()), "removed": len(removed), "rebuilt": False}
+        except RuntimeError:
+            pass
+    if stats is None:
+        index = build_index(vecs, backend, ids=ids, **params)
+        stats = {"added": len(ids), "removed": 0, "rebuilt": True}
+
+    if cache_path and backend != "flat" and (stats["added"] or stats["removed"]):
+        tmp_path = f"{_ids_path(cache_path)}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, ids)
+        save_index(index, cache_path)
+        os.replace(tmp_path, _ids_path(cache_path))
+    return index, stats
+
+
+def index_memory_bytes(index: faiss.Index) -> int:
+    """직렬화 크기 기준 인덱스 메모리 사용량(bytes)"""
+    return int(faiss.serialize_index(index).nbytes)